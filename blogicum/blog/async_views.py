@@ -0,0 +1,244 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import copy_context
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.db import close_old_connections
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from blog.caching import (
+    AnonymousPageCacheMixin, check_publication_boundary, page_cache_key,
+    publication_aware_timeout
+)
+from blog.instrumentation import record_active_counters
+from blog.mixins_filters import filter_posts
+from blog.paginators import get_keyset_page
+from blog.routers import primary_reads
+from blog.views import CategoryPostsView, IndexView, PostDetailView
+
+orm_pool = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_ORM_THREADS, thread_name_prefix='blog-orm'
+)
+
+
+def _run_job(func, args, kwargs):
+    close_old_connections()
+    with record_active_counters():
+        return func(*args, **kwargs)
+
+
+async def run_sync(func, *args, **kwargs):
+    """Выполняет синхронный код (ORM, кэш, шаблоны) в пуле orm_pool.
+
+    Пул ограничен ASYNC_ORM_THREADS потоками, так что медленные
+    запросы к базе не занимают по потоку на каждый запрос. Задача
+    выполняется в копии текущего контекста: маршрутизация реплики
+    и счётчики запросов переходят в поток пула.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        orm_pool, partial(copy_context().run, _run_job, func, args, kwargs)
+    )
+
+
+class PrefetchedPageMixin:
+    """Отдаёт ListView страницу, уже прочитанную асинхронным вариантом."""
+
+    prefetched_page = None
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.prefetched_page is not None:
+            return self.prefetched_page
+        return super().paginate_queryset(queryset, page_size)
+
+
+class AsyncReadView:
+    """Асинхронный вариант синхронного представления чтения.
+
+    Валидаторы условного GET, кэш страниц для анонимов и шаблоны
+    берутся из view_class; независимые выборки get_context_data()
+    выполняет одновременно через asyncio.gather.
+    """
+
+    view_class = None
+
+    def __init__(self, request, *args, **kwargs):
+        self.request = request
+        self.view = self.view_class()
+        self.view.setup(request, *args, **kwargs)
+        self.etag = self.last_modified = self.cache_key = None
+
+    @classmethod
+    def as_view(cls):
+        async def view(request, *args, **kwargs):
+            return await cls(request, *args, **kwargs).dispatch()
+
+        view.view_class = cls
+        return view
+
+    async def dispatch(self):
+        if self.request.method != 'GET':
+            return await run_sync(
+                self.view.dispatch,
+                self.request, *self.view.args, **self.view.kwargs
+            )
+        response = await run_sync(self.get_early_response)
+        if response is None:
+            # Страница для кэша читается с основной базы (см. primary_reads).
+            with primary_reads() if self.cache_key else nullcontext():
+                context = await self.get_context_data()
+                response = await run_sync(self.render, context)
+        return self.add_validators(response)
+
+    def get_early_response(self):
+        """Ответ 304 или страница из кэша; None, если нужна выборка."""
+        etag, last_modified = self.view.get_validators()
+        if etag:
+            self.etag = quote_etag(etag)
+        if last_modified:
+            self.last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(
+            self.request, etag=self.etag, last_modified=self.last_modified
+        )
+        if response is not None:
+            return response
+        if (
+            isinstance(self.view, AnonymousPageCacheMixin)
+            and not self.request.user.is_authenticated
+        ):
+            check_publication_boundary()
+            self.cache_key = page_cache_key(
+                self.request, self.view.get_feed_scope()
+            )
+            return cache.get(self.cache_key)
+        return None
+
+    async def get_context_data(self):
+        raise NotImplementedError
+
+    def render(self, context):
+        response = TemplateResponse(
+            self.request, self.view.get_template_names(),
+            self.view.get_context_data(**context),
+        )
+        response.render()
+        if (
+            self.cache_key is not None
+            and response.status_code == 200 and not response.cookies
+        ):
+            cache.set(
+                self.cache_key, response,
+                publication_aware_timeout(self.view.page_cache_timeout)
+            )
+        return response
+
+    def add_validators(self, response):
+        if self.last_modified and not response.has_header('Last-Modified'):
+            response['Last-Modified'] = http_date(self.last_modified)
+        if self.etag:
+            response.headers.setdefault('ETag', self.etag)
+        return response
+
+
+class AsyncListView(AsyncReadView):
+    """Список публикаций: число записей и строки страницы читаются разом."""
+
+    def get_page_number(self, paginator):
+        page = self.request.GET.get(self.view.page_kwarg) or 1
+        try:
+            return int(page)
+        except ValueError:
+            if page == 'last':
+                return paginator.num_pages
+            raise Http404('Неверный номер страницы.')
+
+    async def paginate(self, queryset):
+        view = self.view
+        if view.keyset_pagination:
+            paginator = view.keyset_paginator_class(
+                queryset, view.paginate_by
+            )
+            page = await run_sync(get_keyset_page, paginator, self.request)
+            return paginator, page, page.object_list, page.has_other_pages()
+        paginator = view.get_paginator(queryset, view.paginate_by)
+        number = await run_sync(self.get_page_number, paginator)
+        bottom = (max(number, 1) - 1) * paginator.per_page
+        count, rows = await asyncio.gather(
+            run_sync(lambda: paginator.count),
+            run_sync(list, queryset[bottom:bottom + paginator.per_page]),
+        )
+        try:
+            number = paginator.validate_number(number)
+        except InvalidPage as error:
+            raise Http404(f'Неверная страница ({number}): {error}')
+        page = paginator._get_page(rows, number, paginator)
+        return paginator, page, rows, page.has_other_pages()
+
+    async def get_context_data(self):
+        self.view.object_list = self.view.get_queryset()
+        self.view.prefetched_page = await self.paginate(
+            self.view.object_list
+        )
+        return {}
+
+
+class IndexPage(PrefetchedPageMixin, IndexView):
+    pass
+
+
+class CategoryPage(PrefetchedPageMixin, CategoryPostsView):
+
+    def get_queryset(self):
+        # Фильтр по slug не ждёт загрузки категории.
+        return filter_posts(
+            apply_filters=True, add_annotations=True
+        ).filter(category__slug=self.kwargs['category_slug'])
+
+    def get_count_cache_key(self):
+        return f'category-slug:{self.kwargs["category_slug"]}'
+
+
+class AsyncIndexView(AsyncListView):
+    view_class = IndexPage
+
+
+class AsyncCategoryPostsView(AsyncListView):
+    view_class = CategoryPage
+
+    async def get_context_data(self):
+        # Категория кладётся в карту идентичности запроса: шаблонный
+        # контекст CategoryPostsView возьмёт её оттуда без запроса.
+        _, context = await asyncio.gather(
+            run_sync(self.view.get_category),
+            super().get_context_data(),
+        )
+        return context
+
+
+class PostDetailPage(PostDetailView):
+    prefetched_comments = None
+
+    def get_comments_page(self):
+        if self.prefetched_comments is not None:
+            return self.prefetched_comments
+        return super().get_comments_page()
+
+
+class AsyncPostDetailView(AsyncReadView):
+    view_class = PostDetailPage
+
+    async def get_context_data(self):
+        post, comments = await asyncio.gather(
+            run_sync(self.view.get_object),
+            run_sync(self.view.get_comments_page),
+        )
+        self.view.object = post
+        self.view.prefetched_comments = comments
+        return {'object': post}
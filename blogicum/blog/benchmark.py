@@ -0,0 +1,188 @@
+import math
+import platform
+import time
+from statistics import mean
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from blog import urls as blog_urls
+from blog.instrumentation import QueryCounter
+from blog.mixins_filters import filter_posts
+from blog.models import Category, Comment, Post
+from pages import urls as pages_urls
+
+# Client по умолчанию ходит на testserver, которого нет в ALLOWED_HOSTS.
+BENCHMARK_HOST = 'localhost'
+
+
+def percentile(values, share):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(share * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def route_names():
+    return sorted(
+        f'{module.app_name}:{pattern.name}'
+        for module, patterns in (
+            (blog_urls, blog_urls.urlpatterns + blog_urls.post_urls),
+            (pages_urls, pages_urls.urlpatterns),
+        )
+        for pattern in patterns
+        if getattr(pattern, 'name', None)
+    )
+
+
+def build_cases(user=None):
+    """Адреса для замеров: (метка, имя маршрута, URL).
+
+    Берутся самые нагруженные объекты: публикация с наибольшим числом
+    комментариев, самая большая категория и самый активный автор.
+    Если передан user, правка и удаление проверяются на его записях.
+    """
+    posts = filter_posts(apply_filters=True)
+    post = posts.order_by('-comment_count', '-pub_date').first()
+    category = (
+        Category.objects.filter(is_published=True)
+        .annotate(total=Count('posts')).order_by('-total').first()
+    )
+    author = (
+        User.objects.annotate(total=Count('posts'))
+        .order_by('-total').first()
+    )
+    own_post = post
+    if user is not None:
+        own_post = (
+            Post.objects.filter(author=user).order_by('-comment_count')
+            .first() or post
+        )
+    comment = Comment.objects.filter(post=own_post)
+    if user is not None:
+        comment = comment.filter(author=user)
+    comment = comment.first()
+    if post is None or category is None or author is None:
+        return []
+    last_page = max(math.ceil(posts.count() / settings.POSTS_LIMIT), 1)
+    post_args = [post.pk]
+    own_args = [own_post.pk]
+    cases = [
+        ('blog:index', '', {}),
+        ('blog:index', f'?page={last_page}', {}),
+        ('blog:search', '?q=' + post.title.split()[0], {}),
+        ('blog:feed', '', {}),
+        ('blog:feed_atom', '', {}),
+        ('blog:category_posts', '', {'args': [category.slug]}),
+        ('blog:category_feed', '', {'args': [category.slug]}),
+        ('blog:category_feed_atom', '', {'args': [category.slug]}),
+        ('blog:profile', '', {'args': [author.username]}),
+        ('blog:profile_feed', '', {'args': [author.username]}),
+        ('blog:profile_feed_atom', '', {'args': [author.username]}),
+        ('blog:edit_profile', '', {}),
+        ('blog:post_detail', '', {'args': post_args}),
+        ('blog:comments', '', {'args': post_args}),
+        ('blog:create_post', '', {}),
+        ('blog:edit_post', '', {'args': own_args}),
+        ('blog:delete_post', '', {'args': own_args}),
+        ('blog:add_comment', '', {'args': own_args}),
+        ('blog:export', '', {'args': ['posts']}),
+        ('blog:query_stats', '', {}),
+        ('pages:about', '', {}),
+        ('pages:rules', '', {}),
+    ]
+    if comment is not None:
+        cases += [
+            ('blog:edit_comment', '', {'args': [own_post.pk, comment.pk]}),
+            ('blog:delete_comment', '', {'args': [own_post.pk, comment.pk]}),
+        ]
+    return [
+        (name + query, name, reverse(name, **kwargs) + query)
+        for name, query, kwargs in cases
+    ]
+
+
+def measure(client, url, iterations, warmup=1, cold_cache=False):
+    for _ in range(warmup):
+        consume(client.get(url))
+    timings = []
+    queries = []
+    statuses = set()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if cold_cache:
+            cache.clear()
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with counter.record():
+            response = client.get(url)
+            consume(response)
+        timings.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+        statuses.add(response.status_code)
+    elapsed = time.perf_counter() - started
+    return {
+        'url': url,
+        'status': sorted(statuses),
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'mean_ms': round(mean(timings), 3),
+        'throughput_rps': round(iterations / elapsed, 1),
+        'queries': round(mean(queries), 2),
+    }
+
+
+def consume(response):
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+
+
+def run_benchmark(iterations=50, warmup=1, user=None, cold_cache=False,
+                  only=None):
+    """Прогоняет маршруты blog и pages в процессе и собирает сводку."""
+    client = Client(HTTP_HOST=BENCHMARK_HOST)
+    if user is not None:
+        client.force_login(user)
+    cases = build_cases(user)
+    results = {}
+    for label, name, url in cases:
+        if only and not any(part in label for part in only):
+            continue
+        results[label] = measure(client, url, iterations, warmup, cold_cache)
+    covered = {name for _, name, _ in cases}
+    return {
+        'meta': {
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'posts': Post.objects.count(),
+            'comments': Comment.objects.count(),
+            'users': User.objects.count(),
+            'user': user.username if user is not None else None,
+            'iterations': iterations,
+            'cold_cache': cold_cache,
+        },
+        'routes': results,
+        'skipped': [name for name in route_names() if name not in covered],
+    }
+
+
+def compare(baseline, current, metric='p95_ms'):
+    """Строки «маршрут: было → стало (изменение)» для общих маршрутов."""
+    lines = []
+    for label, result in sorted(current['routes'].items()):
+        before = baseline['routes'].get(label)
+        if before is None or not before[metric]:
+            continue
+        change = (result[metric] - before[metric]) / before[metric] * 100
+        lines.append(
+            f'{label}: {before[metric]} → {result[metric]} ({change:+.1f}%)'
+        )
+    return lines
@@ -0,0 +1,306 @@
+import hashlib
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from blog.models import Category, Post, User
+from blog.routers import primary_reads
+
+FEED_VERSION_KEY = 'blog:feed-version'
+# Области лент: у каждой своя версия, поэтому запись инвалидирует
+# только ленты, где видна изменённая публикация.
+INDEX_SCOPE = 'index'
+# Ленты, которые могут показать любую публикацию (поиск).
+ANY_POST_SCOPE = 'any-post'
+POST_CARD_VERSION_KEY = 'blog:post-card-version'
+POST_COUNT_VERSION_KEY = 'blog:post-count-version'
+NEXT_PUBLICATION_KEY = 'blog:next-publication'
+NO_SCHEDULED_POSTS = 'none'
+NO_POSTS = 'none'
+
+
+def get_version(key):
+    cache.add(key, 1, timeout=None)
+    return cache.get(key, 1)
+
+
+def get_version_changed_at(key):
+    """Момент последней смены версии.
+
+    Если отметка потеряна, считается, что версия сменилась сейчас:
+    лишний ответ 200 безопаснее устаревшего 304.
+    """
+    changed_key = f'{key}:changed-at'
+    cache.add(changed_key, timezone.now(), timeout=None)
+    return cache.get(changed_key) or timezone.now()
+
+
+def bump_version(key):
+    """Инвалидирует все ключи, построенные на этой версии, разом.
+
+    Старые ключи не удаляются, а перестают читаться и вытесняются
+    по таймауту.
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+    cache.set(f'{key}:changed-at', timezone.now(), timeout=None)
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def feed_scope_key(scope):
+    return f'{FEED_VERSION_KEY}:{scope}'
+
+
+def get_feed_version(scope=ANY_POST_SCOPE):
+    """Версия ленты: общая версия и версия её области."""
+    return (
+        f'{get_version(FEED_VERSION_KEY)}.'
+        f'{get_version(feed_scope_key(scope))}'
+    )
+
+
+def get_feed_changed_at(scope=ANY_POST_SCOPE):
+    return max(
+        get_version_changed_at(FEED_VERSION_KEY),
+        get_version_changed_at(feed_scope_key(scope)),
+    )
+
+
+def bump_feed_version(*scopes):
+    """Инвалидирует ленты перечисленных областей, без них — все."""
+    keys = [feed_scope_key(scope) for scope in scopes]
+    for key in keys or [FEED_VERSION_KEY]:
+        bump_version(key)
+
+
+def feed_scopes(category_ids=(), author_ids=()):
+    """Области лент с публикациями этих категорий и авторов."""
+    scopes = {INDEX_SCOPE, ANY_POST_SCOPE}
+    category_ids = set(category_ids) - {None}
+    author_ids = set(author_ids) - {None}
+    if category_ids:
+        scopes.update(
+            category_scope(slug) for slug in Category.objects.filter(
+                pk__in=category_ids
+            ).values_list('slug', flat=True)
+        )
+    if author_ids:
+        scopes.update(
+            author_scope(username) for username in User.objects.filter(
+                pk__in=author_ids
+            ).values_list('username', flat=True)
+        )
+    return scopes
+
+
+def post_feed_scopes(post_id):
+    """Области лент, где показывается публикация post_id."""
+    scopes = {INDEX_SCOPE, ANY_POST_SCOPE}
+    for slug, username in Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author__username'
+    ):
+        if slug is not None:
+            scopes.add(category_scope(slug))
+        scopes.add(author_scope(username))
+    return scopes
+
+
+def get_post_card_version():
+    return get_version(POST_CARD_VERSION_KEY)
+
+
+def bump_post_card_version():
+    # Карточка показывает категорию, место и автора публикации.
+    bump_version(POST_CARD_VERSION_KEY)
+
+
+def get_post_count_version():
+    return get_version(POST_COUNT_VERSION_KEY)
+
+
+def bump_post_count_version():
+    bump_version(POST_COUNT_VERSION_KEY)
+
+
+def get_next_publication():
+    """Дата ближайшей отложенной публикации или None.
+
+    Значение хранится в кэше без срока и сбрасывается сигналами при
+    изменении публикаций, поэтому запрос к базе выполняется только
+    после записи или после наступления очередной публикации.
+    """
+    value = cache.get(NEXT_PUBLICATION_KEY)
+    if value is None:
+        with primary_reads():
+            value = Post.objects.filter(
+                is_published=True, pub_date__gt=timezone.now()
+            ).order_by('pub_date').values_list('pub_date', flat=True).first()
+        if value is None:
+            value = NO_SCHEDULED_POSTS
+        cache.set(NEXT_PUBLICATION_KEY, value, timeout=None)
+    return None if value == NO_SCHEDULED_POSTS else value
+
+
+def forget_next_publication():
+    cache.delete(NEXT_PUBLICATION_KEY)
+
+
+def check_publication_boundary():
+    """Инвалидирует ленты, если отложенная публикация уже вышла."""
+    next_publication = get_next_publication()
+    if next_publication is not None and next_publication <= timezone.now():
+        bump_feed_version()
+        bump_post_count_version()
+        forget_next_publication()
+
+
+def publication_aware_timeout(timeout):
+    """Срок жизни ключа, не выходящий за ближайшую публикацию."""
+    next_publication = get_next_publication()
+    if next_publication is None:
+        return timeout
+    seconds = math.ceil((next_publication - timezone.now()).total_seconds())
+    return max(1, min(timeout, seconds))
+
+
+def page_cache_key(request, scope=ANY_POST_SCOPE):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:page:{get_feed_version(scope)}:{path}'
+
+
+class FeedScopeMixin:
+    """Область лент, по версии которой строятся ключи кэша страницы."""
+
+    def get_feed_scope(self):
+        return ANY_POST_SCOPE
+
+
+class AnonymousPageCacheMixin(FeedScopeMixin):
+    """Кэширует страницы, отданные анонимным пользователям.
+
+    Ключ строится по полному URL (включая номер страницы) и версии
+    области лент из get_feed_scope(), которую повышают сигналы при
+    изменении публикаций этой области.
+    """
+
+    page_cache_timeout = settings.PAGE_CACHE_TIMEOUT
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        check_publication_boundary()
+        key = page_cache_key(request, self.get_feed_scope())
+        response = cache.get(key)
+        if response is not None:
+            return response
+        # Страница попадёт в кэш, поэтому выборки и шаблон выполняются
+        # на основной базе, и шаблон рендерится внутри блока.
+        with primary_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+        if response.status_code == 200 and not response.cookies:
+            cache.set(
+                key, response,
+                publication_aware_timeout(self.page_cache_timeout)
+            )
+        return response
+
+
+class ConditionalGetMixin:
+    """Отвечает 304, если страница не менялась с прошлого запроса.
+
+    Наследник возвращает из get_validator_state() значения, от которых
+    зависит страница, и время её изменения. Метод должен обходиться
+    одним лёгким запросом: при совпадении валидаторов основная выборка
+    и шаблон не выполняются.
+    """
+
+    def get_validator_state(self):
+        """Пара (значения для ETag, время изменения) или None."""
+        raise NotImplementedError
+
+    def get_validators(self):
+        if not hasattr(self, '_validators'):
+            self._validators = (None, None)
+            state = self.get_validator_state()
+            if state is not None:
+                parts, last_modified = state
+                # Шапка, кнопки и форма зависят от пользователя, а карточки —
+                # от названий категорий, мест и имён авторов. Ключ сессии
+                # меняется при каждом входе вместе с CSRF-токеном: страница
+                # из кэша браузера со старым токеном дала бы 403 на форме.
+                user = self.request.user
+                session_key = (
+                    self.request.session.session_key
+                    if user.is_authenticated else None
+                )
+                parts = (
+                    self.request.get_full_path(), user.pk, session_key,
+                    get_post_card_version(), *parts,
+                )
+                last_modified = max(
+                    last_modified or timezone.now(),
+                    get_version_changed_at(POST_CARD_VERSION_KEY),
+                )
+                etag = hashlib.md5(repr(parts).encode()).hexdigest()
+                self._validators = (etag, last_modified)
+        return self._validators
+
+    def dispatch(self, request, *args, **kwargs):
+        view = super().dispatch
+        if request.method in ('GET', 'HEAD'):
+            view = condition(
+                etag_func=lambda *args, **kwargs: self.get_validators()[0],
+                last_modified_func=(
+                    lambda *args, **kwargs: self.get_validators()[1]
+                ),
+            )(view)
+        return view(request, *args, **kwargs)
+
+
+class FeedConditionalGetMixin(ConditionalGetMixin, FeedScopeMixin):
+    """Валидаторы ленты: дата свежей видимой публикации и версия лент.
+
+    Дата читается запросом LIMIT 1 по индексу pub_date и хранится
+    в кэше до смены версии области лент; правки публикаций
+    и комментариев учитываются через саму версию.
+    """
+
+    def get_newest_pub_date(self):
+        path = hashlib.md5(self.request.path.encode()).hexdigest()
+        # Автор видит в профиле и скрытые публикации.
+        version = get_feed_version(self.get_feed_scope())
+        key = f'blog:newest:{version}:{path}:{self.request.user.pk}'
+        newest = cache.get(key)
+        if newest is None:
+            with primary_reads():
+                newest = (
+                    self.get_queryset().order_by('-pub_date')
+                    .values_list('pub_date', flat=True).first()
+                ) or NO_POSTS
+            cache.set(
+                key, newest,
+                publication_aware_timeout(settings.PAGE_CACHE_TIMEOUT)
+            )
+        return None if newest == NO_POSTS else newest
+
+    def get_validator_state(self):
+        check_publication_boundary()
+        newest = self.get_newest_pub_date()
+        scope = self.get_feed_scope()
+        changed_at = get_feed_changed_at(scope)
+        last_modified = max(newest, changed_at) if newest else changed_at
+        return (get_feed_version(scope), newest), last_modified
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+from blog.caching import get_post_card_version
+
+
+def cache_versions(request):
+    # Передаём функцию: шаблон вызовет её, только если версия понадобится.
+    return {
+        'post_card_version': get_post_card_version,
+        'post_card_cache_timeout': settings.POST_CARD_CACHE_TIMEOUT,
+    }
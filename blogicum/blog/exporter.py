@@ -0,0 +1,106 @@
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from blog.models import Comment, Post
+
+EXPORT_MODELS = {'posts': Post, 'comments': Comment}
+EXPORT_FORMATS = ('jsonl', 'csv')
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+# wbits=31: zlib пишет заголовок и контрольную сумму gzip.
+GZIP_WBITS = 31
+
+
+def export_fields(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def iter_rows(model, fields, chunk_size=CHUNK_SIZE):
+    """Обходит таблицу пачками по первичному ключу.
+
+    Каждая пачка читается отдельным запросом WHERE id > последний,
+    поэтому в памяти не больше chunk_size строк, а глубокие пачки
+    не дороже первых.
+    """
+    queryset = model._base_manager.order_by('pk').values(*fields)
+    pk_name = model._meta.pk.attname
+    last_pk = None
+    while True:
+        chunk = queryset
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        row = None
+        for row in chunk[:chunk_size].iterator(chunk_size=chunk_size):
+            yield row
+        if row is None:
+            return
+        last_pk = row[pk_name]
+
+
+def iter_jsonl(rows, fields):
+    for row in rows:
+        yield json.dumps(
+            row, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+class Echo:
+    """Файлоподобный объект, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([
+            json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+            if isinstance(value, (dict, list)) else value
+            for value in row.values()
+        ])
+
+
+def iter_buffered(chunks, size=BUFFER_SIZE):
+    """Склеивает мелкие куски, чтобы не писать в сокет по строке."""
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b''.join(buffer)
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(wbits=GZIP_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(table, export_format, compress=False, chunk_size=CHUNK_SIZE):
+    """Байты выгрузки таблицы в JSONL или CSV, по желанию сжатые gzip."""
+    model = EXPORT_MODELS[table]
+    fields = export_fields(model)
+    formatter = iter_jsonl if export_format == 'jsonl' else iter_csv
+    chunks = (
+        text.encode()
+        for text in formatter(iter_rows(model, fields, chunk_size), fields)
+    )
+    chunks = iter_buffered(chunks)
+    return iter_gzip(chunks) if compress else chunks
+
+
+def export_filename(table, export_format, compress=False):
+    return f'{table}.{export_format}' + ('.gz' if compress else '')
@@ -0,0 +1,164 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from blog.caching import (
+    INDEX_SCOPE, author_scope, category_scope, check_publication_boundary,
+    get_feed_version, get_post_card_version, publication_aware_timeout
+)
+from blog.mixins_filters import filter_posts
+from blog.models import Category
+from blog.routers import primary_reads
+
+FEED_TITLE = 'Блогикум'
+
+
+def feed_posts(category_slug=None, username=None):
+    queryset = filter_posts(apply_filters=True, add_annotations=True)
+    if category_slug is not None:
+        queryset = queryset.filter(category__slug=category_slug)
+    if username is not None:
+        queryset = queryset.filter(author__username=username)
+    return queryset[:settings.POSTS_LIMIT]
+
+
+def feed_scope(category_slug=None, username=None):
+    if category_slug is not None:
+        return category_scope(category_slug)
+    if username is not None:
+        return author_scope(username)
+    return INDEX_SCOPE
+
+
+def feed_state(category_slug=None, username=None):
+    """Возвращает ETag и дату изменения ленты, не собирая её.
+
+    Читаются только id и даты публикаций из ленты; результат живёт
+    в кэше до смены версии области лент, поэтому повторный опрос обычно
+    обходится без запросов к базе.
+    """
+    check_publication_boundary()
+    card_version = get_post_card_version()
+    version = get_feed_version(feed_scope(category_slug, username))
+    key = (
+        f'blog:feed-state:{version}:{card_version}:'
+        f'{category_slug}:{username}'
+    )
+    state = cache.get(key)
+    if state is None:
+        with primary_reads():
+            rows = list(
+                feed_posts(category_slug, username)
+                .values_list('pk', 'pub_date', 'updated_at')
+            )
+        etag = hashlib.md5(f'{card_version}:{rows}'.encode()).hexdigest()
+        last_modified = max(
+            (max(pub_date, updated_at) for _, pub_date, updated_at in rows),
+            default=None,
+        )
+        state = (etag, last_modified)
+        cache.set(
+            key, state, publication_aware_timeout(settings.PAGE_CACHE_TIMEOUT)
+        )
+    return state
+
+
+def conditional_feed(feed):
+    """Оборачивает ленту так, чтобы на неизменную ленту отвечать 304."""
+    return condition(
+        etag_func=lambda request, **kwargs: feed_state(**kwargs)[0],
+        last_modified_func=lambda request, **kwargs: feed_state(**kwargs)[1],
+    )(feed)
+
+
+class PostsFeed(Feed):
+    title = FEED_TITLE
+    description = subtitle = 'Новые публикации'
+
+    def link(self):
+        return reverse('blog:index')
+
+    def items(self):
+        return feed_posts()
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.category.title] if item.category else []
+
+
+class CategoryPostsFeed(PostsFeed):
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def title(self, obj):
+        return f'{FEED_TITLE}: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    subtitle = description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=[obj.slug])
+
+    def items(self, obj):
+        return feed_posts(category_slug=obj.slug)
+
+
+class AuthorPostsFeed(PostsFeed):
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'{FEED_TITLE}: {obj.username}'
+
+    def description(self, obj):
+        return f'Публикации пользователя {obj.username}'
+
+    subtitle = description
+
+    def link(self, obj):
+        return reverse('blog:profile', args=[obj.username])
+
+    def items(self, obj):
+        return feed_posts(username=obj.username)
+
+
+class PostsAtomFeed(PostsFeed):
+    feed_type = Atom1Feed
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
@@ -1,5 +1,4 @@
 from django import forms
-from django.core.mail import send_mail
 
 from .models import Post, Comment
 
@@ -21,14 +20,3 @@ class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
-
-    def clean(self):
-        super().clean()
-        text = self.cleaned_data['text']
-        send_mail(
-            subject='Another Beatles member',
-            message=f'{text} пытался написать коммент!',
-            from_email='birthday_form@acme.not',
-            recipient_list=['admin@acme.not'],
-            fail_silently=True,
-        )
@@ -0,0 +1,93 @@
+import base64
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+FORMAT_EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp', 'PNG': 'png'}
+PLACEHOLDER_SIZE = 16
+EXIF_ORIENTATION = 0x0112
+# Значения EXIF Orientation, при которых фото повёрнуто на 90°.
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def rendition_format():
+    image_format = settings.POST_IMAGE_RENDITION_FORMAT.upper()
+    if image_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return image_format
+
+
+def rendition_name(source_name, width, image_format):
+    directory, filename = posixpath.split(source_name)
+    stem = posixpath.splitext(filename)[0]
+    extension = FORMAT_EXTENSIONS[image_format]
+    return posixpath.join(
+        directory, 'renditions', f'{stem}_{width}w.{extension}'
+    )
+
+
+def delete_renditions(renditions):
+    for name in renditions.get('widths', {}).values():
+        default_storage.delete(name)
+
+
+def oriented_size(image):
+    """Размеры фото с учётом EXIF-поворота; читает только заголовок."""
+    width, height = image.size
+    if image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+        return height, width
+    return width, height
+
+
+def make_placeholder(image):
+    """Крошечное превью в виде data URI для фона до загрузки фото."""
+    preview = image.convert('RGB')
+    preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = BytesIO()
+    preview.save(buffer, format='JPEG', quality=40)
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/jpeg;base64,{encoded}'
+
+
+def make_renditions(source_name, storage=default_storage):
+    """Сохраняет уменьшенные копии изображения рядом с оригиналом.
+
+    Возвращает словарь для Post.image_renditions: пути копий, размеры
+    оригинала и плейсхолдер. Копии шире оригинала не создаются.
+    """
+    image_format = rendition_format()
+    largest = max(settings.POST_IMAGE_RENDITION_WIDTHS)
+    with storage.open(source_name, 'rb') as source:
+        image = Image.open(source)
+        width, height = oriented_size(image)
+        # JPEG декодируется сразу в уменьшенном масштабе, если это возможно.
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    widths = {}
+    for target in sorted(settings.POST_IMAGE_RENDITION_WIDTHS):
+        if target >= image.width:
+            break
+        size = (target, round(image.height * target / image.width))
+        resized = image.resize(size, Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        resized.save(buffer, format=image_format, quality=80)
+        name = rendition_name(source_name, target, image_format)
+        storage.delete(name)
+        widths[str(target)] = storage.save(
+            name, ContentFile(buffer.getvalue())
+        )
+    return {
+        'source': source_name,
+        'format': image_format,
+        'width': width,
+        'height': height,
+        'widths': widths,
+        'placeholder': make_placeholder(image),
+    }
@@ -0,0 +1,191 @@
+import json
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.color import no_style
+from django.core.serializers import python
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog.caching import (
+    bump_feed_version, bump_post_card_version, bump_post_count_version,
+    forget_next_publication
+)
+from blog.search import search_index_suspended
+
+CHUNK_SIZE = 64 * 1024
+# Порядок вставки: родительские таблицы раньше дочерних.
+IMPORT_ORDER = (
+    settings.AUTH_USER_MODEL,
+    'blog.Category',
+    'blog.Location',
+    'blog.Post',
+    'blog.Comment',
+)
+
+
+def _skip_whitespace(stream, buffer, chunk_size):
+    buffer = buffer.lstrip()
+    while not buffer:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            raise ValueError('Неожиданный конец файла.')
+        buffer = chunk.lstrip()
+    return buffer
+
+
+def _decode_object(decoder, stream, buffer, chunk_size):
+    if buffer[0] != '{':
+        raise ValueError(f'Ожидался объект, получено {buffer[0]!r}.')
+    while True:
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            # Объект не поместился во фрагмент: дочитываем файл.
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise
+            buffer += chunk
+        else:
+            return obj, buffer[end:]
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """Читает JSON-массив объектов по одному элементу.
+
+    В памяти держится только текущий фрагмент файла, поэтому размер
+    дампа не ограничен объёмом памяти.
+    """
+    decoder = json.JSONDecoder()
+    buffer = _skip_whitespace(stream, '', chunk_size)
+    if buffer[0] != '[':
+        raise ValueError('Дамп должен быть JSON-массивом.')
+    buffer = _skip_whitespace(stream, buffer[1:], chunk_size)
+    while buffer[0] != ']':
+        obj, buffer = _decode_object(decoder, stream, buffer, chunk_size)
+        yield obj
+        buffer = _skip_whitespace(stream, buffer, chunk_size)
+        if buffer[0] == ',':
+            buffer = _skip_whitespace(stream, buffer[1:], chunk_size)
+        elif buffer[0] != ']':
+            raise ValueError(f'Ожидалась запятая, получено {buffer[0]!r}.')
+
+
+class BulkImporter:
+    """Копит объекты по моделям и вставляет их пачками.
+
+    Вставка идёт в режиме raw, как в loaddata: даты auto_now и
+    auto_now_add берутся из дампа, а сигналы не отправляются.
+    """
+
+    def __init__(self, batch_size, using=DEFAULT_DB_ALIAS):
+        self.models = [apps.get_model(label) for label in IMPORT_ORDER]
+        self.batch_size = batch_size
+        self.using = using
+        self.buffers = {model: [] for model in self.models}
+        self.auto_date_fields = {
+            model: [
+                field for field in model._meta.concrete_fields
+                if getattr(field, 'auto_now', False)
+                or getattr(field, 'auto_now_add', False)
+            ]
+            for model in self.models
+        }
+        self.counts = Counter()
+
+    def add(self, obj):
+        model = type(obj)
+        for field in self.auto_date_fields[model]:
+            if getattr(obj, field.attname) is None:
+                field.pre_save(obj, add=True)
+        buffer = self.buffers[model]
+        buffer.append(obj)
+        if len(buffer) >= self.batch_size:
+            self.flush(until=model)
+
+    def flush(self, until=None):
+        for model in self.models:
+            self._insert(model)
+            if model is until:
+                break
+
+    def _insert(self, model):
+        objs = self.buffers[model]
+        if not objs:
+            return
+        fields = model._meta.concrete_fields
+        ops = connections[self.using].ops
+        size = max(ops.bulk_batch_size(fields, objs), 1)
+        for start in range(0, len(objs), size):
+            model._base_manager._insert(
+                objs[start:start + size], fields=fields,
+                raw=True, using=self.using,
+            )
+        self.counts[model._meta.label] += len(objs)
+        objs.clear()
+
+    def finish(self):
+        """Проверяет внешние ключи и сдвигает счётчики первичных ключей."""
+        imported = [
+            model for model in self.models
+            if self.counts[model._meta.label]
+        ]
+        connection = connections[self.using]
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in imported]
+        )
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), imported)
+        with connection.cursor() as cursor:
+            for line in sequence_sql:
+                cursor.execute(line)
+
+
+def import_objects(objects, batch_size=2000, using=DEFAULT_DB_ALIAS):
+    """Вставляет объекты моделей из IMPORT_ORDER одной транзакцией.
+
+    Возвращает счётчик вставленных строк по моделям.
+    """
+    importer = BulkImporter(batch_size, using)
+    connection = connections[using]
+    with transaction.atomic(using=using), search_index_suspended(using):
+        with connection.constraint_checks_disabled():
+            for obj in objects:
+                importer.add(obj)
+            importer.flush()
+        importer.finish()
+    # Сигналы не срабатывали, поэтому кэши лент сбрасываются вручную.
+    bump_feed_version()
+    bump_post_card_version()
+    bump_post_count_version()
+    forget_next_publication()
+    return importer.counts
+
+
+def import_dump(stream, batch_size=2000, using=DEFAULT_DB_ALIAS,
+                chunk_size=CHUNK_SIZE):
+    """Загружает дамп в формате dumpdata одной транзакцией.
+
+    Возвращает пару счётчиков: вставлено по моделям и пропущено
+    записей других моделей. Связи многие-ко-многим не переносятся.
+    """
+    skipped = Counter()
+    accepted = {apps.get_model(label) for label in IMPORT_ORDER}
+
+    def records():
+        for record in iter_json_array(stream, chunk_size):
+            try:
+                model = apps.get_model(record['model'])
+            except (KeyError, LookupError, ValueError):
+                model = None
+            if model in accepted:
+                yield record
+            else:
+                skipped[record.get('model')] += 1
+
+    objects = (
+        deserialized.object
+        for deserialized in python.Deserializer(
+            records(), using=using, ignorenonexistent=True
+        )
+    )
+    return import_objects(objects, batch_size, using), skipped
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('blog.queries')
+
+_stats = {}
+_stats_lock = threading.Lock()
+_active_counters = ContextVar('blog_query_counters', default=())
+
+
+class QueryCounter:
+    """Считает запросы и время в базе через execute_wrapper.
+
+    В отличие от connection.queries работает и при DEBUG = False.
+    Счётчик, открытый record(), виден в контексте, поэтому код,
+    уходящий в другие потоки, может подключить его через
+    record_active_counters().
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self._lock:
+                self.count += 1
+                self.duration += time.perf_counter() - start
+
+    @contextmanager
+    def record(self):
+        token = _active_counters.set(_active_counters.get() + (self,))
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self))
+                yield self
+        finally:
+            _active_counters.reset(token)
+
+
+@contextmanager
+def record_active_counters():
+    """Подключает открытые в контексте счётчики к соединениям потока."""
+    with ExitStack() as stack:
+        for counter in _active_counters.get():
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+        yield
+
+
+@contextmanager
+def query_budget(budget, label=''):
+    """Падает с AssertionError, если блок сделал больше budget запросов."""
+    counter = QueryCounter()
+    with counter.record():
+        yield counter
+    assert counter.count <= budget, (
+        f'{label or "Блок"}: {counter.count} запросов при бюджете {budget}.'
+    )
+
+
+def record_query_stats(view_name, counter):
+    with _stats_lock:
+        stats = _stats.setdefault(view_name, {
+            'requests': 0, 'queries': 0, 'max_queries': 0, 'db_time': 0.0,
+        })
+        stats['requests'] += 1
+        stats['queries'] += counter.count
+        stats['max_queries'] = max(stats['max_queries'], counter.count)
+        stats['db_time'] += counter.duration
+
+
+def get_query_stats():
+    """Сводка по адресам: запросов и миллисекунд в базе на запрос."""
+    with _stats_lock:
+        return {
+            view_name: {
+                'requests': stats['requests'],
+                'avg_queries': round(stats['queries'] / stats['requests'], 2),
+                'max_queries': stats['max_queries'],
+                'avg_db_time_ms': round(
+                    stats['db_time'] * 1000 / stats['requests'], 3
+                ),
+                'budget': settings.QUERY_BUDGETS.get(view_name),
+            }
+            for view_name, stats in sorted(_stats.items())
+        }
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class QueryStatsMiddleware:
+    """Копит число запросов и время в базе по имени адреса.
+
+    При DEBUG добавляет заголовок Server-Timing, а превышение бюджета
+    из QUERY_BUDGETS пишет в лог blog.queries. Запросы, сделанные
+    при отдаче потокового ответа, не учитываются. В асинхронной цепочке
+    учитываются запросы из пула blog.async_views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        with counter.record():
+            response = self.get_response(request)
+        return self.process_stats(request, response, counter)
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        with counter.record():
+            response = await self.get_response(request)
+        return self.process_stats(request, response, counter)
+
+    def process_stats(self, request, response, counter):
+        match = request.resolver_match
+        if match is None:
+            return response
+        view_name = match.view_name
+        record_query_stats(view_name, counter)
+        if settings.DEBUG:
+            response['Server-Timing'] = (
+                f'db;dur={counter.duration * 1000:.1f};'
+                f'desc="{counter.count} queries"'
+            )
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                '%s: %d запросов при бюджете %d (%s)',
+                view_name, counter.count, budget, request.path,
+            )
+        return response
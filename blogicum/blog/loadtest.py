@@ -0,0 +1,524 @@
+import asyncio
+import importlib
+import io
+import itertools
+import multiprocessing
+import platform
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from statistics import mean
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+)
+from django.contrib.auth.models import User
+from django.core.signals import got_request_exception
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import Count
+from django.middleware.csrf import CSRF_ALLOWED_CHARS, CSRF_TOKEN_LENGTH
+from django.test.utils import override_settings
+from django.urls import clear_url_caches, reverse
+from django.utils.crypto import get_random_string
+
+from blog import urls as blog_urls
+from blog.benchmark import BENCHMARK_HOST, percentile
+from blog.mixins_filters import filter_posts
+from blog.models import Category, Comment, Post
+from blogicum.asgi import application as asgi_application
+from blogicum.wsgi import application as wsgi_application
+
+SCENARIOS = ('feed', 'detail', 'comment')
+DEFAULT_MIX = {'feed': 70, 'detail': 25, 'comment': 5}
+# Верхние границы корзин гистограммы в миллисекундах.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+SAMPLE_POSTS = 200
+SAMPLE_USERS = 20
+FEED_PAGES = 3
+# Заголовок с номером запроса: по нему находятся запросы, на которых
+# база ответила «database is locked».
+REQUEST_ID_HEADER = 'X-Loadtest-Request'
+SERVERS = ('wsgi', 'asgi')
+# Значения самой SQLite: с ними сравнивается профиль из SQLITE_PRAGMAS.
+SQLITE_DEFAULT_PRAGMAS = {
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+    'busy_timeout': 5000,
+    'cache_size': -2000,
+    'mmap_size': 0,
+    'temp_store': 'default',
+}
+
+# Основные коды ошибок SQLite: SQLITE_BUSY и SQLITE_LOCKED.
+SQLITE_LOCK_CODES = (5, 6)
+
+_request_ids = itertools.count()
+_locked = set()
+_locked_lock = threading.Lock()
+
+
+def parse_mix(value):
+    """Разбирает строку вида «feed=70,detail=25,comment=5»."""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS or not weight.strip().isdigit():
+            raise ValueError(f'Неверная доля сценария: {part!r}.')
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise ValueError('Все доли сценариев нулевые.')
+    return mix
+
+
+def is_lock_error(error):
+    """Ошибка блокировки базы, в том числе без «locked» в тексте.
+
+    FTS5 при блокировке своих служебных таблиц сообщает
+    «vtable constructor failed», поэтому решает код ошибки SQLite
+    (Python 3.11+); без него остаётся проверка текста.
+    """
+    if not isinstance(error, OperationalError):
+        return False
+    code = getattr(error.__cause__, 'sqlite_errorcode', None)
+    if code is not None:
+        return (code & 0xff) in SQLITE_LOCK_CODES
+    return 'locked' in str(error)
+
+
+def mark_lock_error(sender, request=None, **kwargs):
+    if request is not None and is_lock_error(sys.exc_info()[1]):
+        with _locked_lock:
+            _locked.add(request.headers.get(REQUEST_ID_HEADER))
+
+
+def was_locked(request):
+    with _locked_lock:
+        if request.headers[REQUEST_ID_HEADER] in _locked:
+            _locked.discard(request.headers[REQUEST_ID_HEADER])
+            return True
+    return False
+
+
+def make_session(user):
+    """Создаёт сессию пользователя так же, как Client.force_login."""
+    engine = importlib.import_module(settings.SESSION_ENGINE)
+    session = engine.SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return session.session_key
+
+
+def build_targets():
+    """Адреса сценариев и сессии авторов комментариев.
+
+    Для чтения ленты берутся первые страницы главной и самых больших
+    категорий, для публикаций — свежие и самые обсуждаемые записи.
+    """
+    posts = filter_posts(apply_filters=True)
+    post_ids = list(dict.fromkeys(
+        list(posts.order_by('-pub_date')
+             .values_list('pk', flat=True)[:SAMPLE_POSTS // 2])
+        + list(posts.order_by('-comment_count')
+               .values_list('pk', flat=True)[:SAMPLE_POSTS // 2])
+    ))
+    if not post_ids:
+        return None
+    categories = (
+        Category.objects.filter(is_published=True)
+        .annotate(total=Count('posts')).order_by('-total')
+        .values_list('slug', flat=True)[:FEED_PAGES]
+    )
+    index = reverse('blog:index')
+    feeds = [
+        f'{index}?page={page}' for page in range(1, FEED_PAGES + 1)
+    ] + [
+        reverse('blog:category_posts', args=[slug]) for slug in categories
+    ]
+    users = User.objects.filter(is_active=True).order_by('pk')[:SAMPLE_USERS]
+    return {
+        'feed': feeds,
+        'detail': [
+            reverse('blog:post_detail', args=[pk]) for pk in post_ids
+        ],
+        'comment': [
+            reverse('blog:add_comment', args=[pk]) for pk in post_ids
+        ],
+        'sessions': [make_session(user) for user in users],
+    }
+
+
+class Request:
+    """Запрос сценария, который можно отдать и WSGI, и ASGI."""
+
+    def __init__(self, path, method='GET', body=b'', headers=None):
+        self.path, _, self.query = path.partition('?')
+        self.method = method
+        self.body = body
+        self.headers = {
+            'Host': BENCHMARK_HOST,
+            REQUEST_ID_HEADER: str(next(_request_ids)),
+            **(headers or {}),
+        }
+        if body:
+            self.headers['Content-Type'] = (
+                'application/x-www-form-urlencoded'
+            )
+            self.headers['Content-Length'] = str(len(body))
+
+    def environ(self):
+        environ = {
+            'REQUEST_METHOD': self.method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': self.path,
+            'QUERY_STRING': self.query,
+            'SERVER_NAME': BENCHMARK_HOST,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(self.body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in self.headers.items():
+            key = name.upper().replace('-', '_')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = 'HTTP_' + key
+            environ[key] = value
+        return environ
+
+    def scope(self):
+        return {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': self.method,
+            'scheme': 'http',
+            'path': self.path,
+            'raw_path': self.path.encode(),
+            'query_string': self.query.encode(),
+            'root_path': '',
+            'headers': [
+                (name.lower().encode(), value.encode())
+                for name, value in self.headers.items()
+            ],
+            'client': ('127.0.0.1', 0),
+            'server': (BENCHMARK_HOST, 80),
+        }
+
+
+def make_request(scenario, targets, rnd):
+    """Очередной запрос сценария."""
+    if scenario == 'comment' and not targets['sessions']:
+        scenario = 'detail'
+    if scenario != 'comment':
+        return Request(rnd.choice(targets[scenario]))
+    token = get_random_string(CSRF_TOKEN_LENGTH, CSRF_ALLOWED_CHARS)
+    body = urlencode({'text': f'Нагрузочный комментарий {rnd.random()}'})
+    session = rnd.choice(targets['sessions'])
+    return Request(
+        rnd.choice(targets['comment']),
+        method='POST',
+        body=body.encode(),
+        headers={
+            'Cookie': (
+                f'{settings.SESSION_COOKIE_NAME}={session}; '
+                f'{settings.CSRF_COOKIE_NAME}={token}'
+            ),
+            'X-CSRFToken': token,
+        },
+    )
+
+
+def call_wsgi(request):
+    """Выполняет запрос и дочитывает тело ответа; возвращает код."""
+    status = []
+
+    def start_response(value, headers, exc_info=None):
+        status.append(value)
+
+    result = wsgi_application(request.environ(), start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return int(status[0].split()[0])
+
+
+async def call_asgi(request):
+    status = []
+    pending = [{
+        'type': 'http.request', 'body': request.body, 'more_body': False,
+    }]
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await asgi_application(request.scope(), receive, send)
+    return status[0]
+
+
+def run_worker(targets, mix, deadline, requests, seed):
+    """Шлёт запросы в WSGI до срока или до исчерпания лимита.
+
+    Возвращает образцы (сценарий, миллисекунды, код, блокировка);
+    код 0 значит, что исключение вылетело за пределы приложения.
+    """
+    rnd = random.Random(seed)
+    names = [name for name in SCENARIOS if mix.get(name)]
+    weights = [mix[name] for name in names]
+    samples = []
+    try:
+        while time.monotonic() < deadline and len(samples) < requests:
+            scenario = rnd.choices(names, weights)[0]
+            request = make_request(scenario, targets, rnd)
+            start = time.perf_counter()
+            try:
+                status = call_wsgi(request)
+                locked = was_locked(request)
+            except Exception as error:
+                status, locked = 0, is_lock_error(error)
+            samples.append((
+                scenario, (time.perf_counter() - start) * 1000, status, locked
+            ))
+    finally:
+        connections.close_all()
+    return samples
+
+
+async def run_task(targets, mix, deadline, requests, seed):
+    """То же, что run_worker, но для ASGI внутри цикла событий."""
+    rnd = random.Random(seed)
+    names = [name for name in SCENARIOS if mix.get(name)]
+    weights = [mix[name] for name in names]
+    samples = []
+    while time.monotonic() < deadline and len(samples) < requests:
+        scenario = rnd.choices(names, weights)[0]
+        request = make_request(scenario, targets, rnd)
+        start = time.perf_counter()
+        try:
+            status = await call_asgi(request)
+            locked = was_locked(request)
+        except Exception as error:
+            status, locked = 0, is_lock_error(error)
+        samples.append((
+            scenario, (time.perf_counter() - start) * 1000, status, locked
+        ))
+    return samples
+
+
+async def run_tasks(targets, mix, tasks, duration, requests, seed):
+    deadline = time.monotonic() + duration
+    chunks = await asyncio.gather(*(
+        run_task(targets, mix, deadline, requests, seed * 1000 + number)
+        for number in range(tasks)
+    ))
+    return [sample for chunk in chunks for sample in chunk]
+
+
+def run_threads(targets, mix, threads, duration, requests, seed):
+    deadline = time.monotonic() + duration
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [
+            executor.submit(
+                run_worker, targets, mix, deadline, requests,
+                seed * 1000 + number,
+            )
+            for number in range(threads)
+        ]
+        return [sample for future in futures for sample in future.result()]
+
+
+@contextmanager
+def async_read_views(enabled=True):
+    """Временно подключает асинхронные представления к адресам blog.
+
+    Вариант выбирается при импорте blog.urls по ASYNC_READ_VIEWS,
+    поэтому модули адресов перечитываются на входе и выходе.
+    """
+    try:
+        with override_settings(ASYNC_READ_VIEWS=enabled):
+            reload_urlconf()
+            yield
+    finally:
+        reload_urlconf()
+
+
+def reload_urlconf():
+    clear_url_caches()
+    importlib.reload(blog_urls)
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+
+
+def run_requests(server, targets, mix, concurrency, duration, requests,
+                 seed):
+    """Прогон в одном процессе: потоки для WSGI, задачи для ASGI."""
+    got_request_exception.connect(mark_lock_error)
+    try:
+        if server == 'asgi':
+            with async_read_views():
+                return asyncio.run(run_tasks(
+                    targets, mix, concurrency, duration, requests, seed
+                ))
+        return run_threads(
+            targets, mix, concurrency, duration, requests, seed
+        )
+    finally:
+        got_request_exception.disconnect(mark_lock_error)
+
+
+def sqlite_profiles():
+    """Профили для сравнения: умолчания SQLite и настройки проекта."""
+    return {
+        'default': (SQLITE_DEFAULT_PRAGMAS, 0),
+        'tuned': (
+            settings.SQLITE_PRAGMAS,
+            settings.DATABASES[DEFAULT_DB_ALIAS].get('CONN_MAX_AGE', 0),
+        ),
+    }
+
+
+@contextmanager
+def sqlite_profile(pragmas, conn_max_age, using=DEFAULT_DB_ALIAS):
+    """Временно меняет PRAGMA и CONN_MAX_AGE для новых соединений.
+
+    Открытые соединения закрываются до и после блока: journal_mode
+    хранится в самом файле базы и меняется, только пока у неё нет
+    других читателей.
+    """
+    settings_dict = connections.settings[using]
+    previous = settings_dict.get('CONN_MAX_AGE', 0)
+    connections.close_all()
+    settings_dict['CONN_MAX_AGE'] = conn_max_age
+    try:
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            connections[using].ensure_connection()
+            yield
+            connections.close_all()
+    finally:
+        settings_dict['CONN_MAX_AGE'] = previous
+        connections.close_all()
+
+
+def _run_process(args):
+    return run_requests(*args)
+
+
+def summarize(samples, elapsed):
+    latencies = [sample[1] for sample in samples]
+    errors = sum(1 for sample in samples if not 200 <= sample[2] < 400)
+    histogram = [0] * (len(BUCKETS_MS) + 1)
+    for latency in latencies:
+        histogram[bisect_left(BUCKETS_MS, latency)] += 1
+    statuses = {}
+    for sample in samples:
+        statuses[str(sample[2])] = statuses.get(str(sample[2]), 0) + 1
+    return {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / elapsed, 1),
+        'error_rate': round(errors / len(samples), 4) if samples else 0,
+        'lock_errors': sum(1 for sample in samples if sample[3]),
+        'status': dict(sorted(statuses.items())),
+        'p50_ms': round(percentile(latencies, 0.5), 3) if samples else None,
+        'p95_ms': round(percentile(latencies, 0.95), 3) if samples else None,
+        'p99_ms': round(percentile(latencies, 0.99), 3) if samples else None,
+        'mean_ms': round(mean(latencies), 3) if samples else None,
+        'histogram_ms': {
+            f'<={bound}': count
+            for bound, count in zip(BUCKETS_MS + ('inf',), histogram)
+        },
+    }
+
+
+def run_load_test(mix=None, threads=4, processes=1, duration=10.0,
+                  requests=None, seed=0, profile=None, server='wsgi'):
+    """Нагружает WSGI- или ASGI-приложение и собирает сводку.
+
+    Каждый процесс запускает threads потоков (для ASGI — столько же
+    одновременных задач в цикле событий с асинхронными
+    представлениями чтения), каждый шлёт не больше requests запросов.
+    Запросы идут напрямую в приложение со всеми middleware, но без
+    сети. Ошибки «database is locked» считаются отдельно от прочих
+    ответов 5xx. profile — имя профиля из sqlite_profiles() для
+    сравнения настроенной SQLite с умолчаниями.
+    """
+    if profile is not None:
+        with sqlite_profile(*sqlite_profiles()[profile]):
+            report = run_load_test(
+                mix, threads, processes, duration, requests, seed,
+                server=server,
+            )
+        if report is not None:
+            report['meta']['sqlite_profile'] = profile
+        return report
+    mix = mix or DEFAULT_MIX
+    targets = build_targets()
+    if targets is None:
+        return None
+    requests = requests or sys.maxsize
+    started = time.perf_counter()
+    if processes > 1:
+        # Дочерние процессы не должны делить открытые соединения.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with context.Pool(processes) as pool:
+            chunks = pool.map(_run_process, [
+                (server, targets, mix, threads, duration, requests,
+                 seed * 1000 + number)
+                for number in range(processes)
+            ])
+        samples = [sample for chunk in chunks for sample in chunk]
+    else:
+        samples = run_requests(
+            server, targets, mix, threads, duration, requests, seed
+        )
+    elapsed = time.perf_counter() - started
+    database = connections.settings['default']
+    return {
+        'meta': {
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': database['ENGINE'],
+            'conn_max_age': database.get('CONN_MAX_AGE', 0),
+            'sqlite_pragmas': settings.SQLITE_PRAGMAS,
+            'posts': Post.objects.count(),
+            'comments': Comment.objects.count(),
+            'mix': mix,
+            'server': server,
+            'async_orm_threads': (
+                settings.ASYNC_ORM_THREADS if server == 'asgi' else None
+            ),
+            'threads': threads,
+            'processes': processes,
+            'duration': round(elapsed, 3),
+            'seed': seed,
+        },
+        'total': summarize(samples, elapsed),
+        'scenarios': {
+            name: summarize(
+                [sample for sample in samples if sample[0] == name], elapsed
+            )
+            for name in SCENARIOS if mix.get(name)
+        },
+    }
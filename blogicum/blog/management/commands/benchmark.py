@@ -0,0 +1,54 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.benchmark import compare, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку (p50/p95/p99), число запросов и пропускную '
+        'способность маршрутов blog и pages и выводит сводку в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument(
+            '--user', help='Имя пользователя, от которого идут запросы.'
+        )
+        parser.add_argument(
+            '--cold-cache', action='store_true',
+            help='Очищать кэш перед каждым запросом.'
+        )
+        parser.add_argument(
+            '--only', action='append',
+            help='Замерять только маршруты, в метке которых есть строка.'
+        )
+        parser.add_argument('--output', '-o', help='Файл для сводки.')
+        parser.add_argument(
+            '--compare', help='Сводка прошлого прогона для сравнения p95.'
+        )
+
+    def handle(self, *args, iterations, warmup, user, cold_cache, only,
+               output, **options):
+        if user is not None:
+            try:
+                user = User.objects.get(username=user)
+            except User.DoesNotExist:
+                raise CommandError(f'Пользователь {user} не найден.')
+        report = run_benchmark(iterations, warmup, user, cold_cache, only)
+        if not report['routes']:
+            raise CommandError('Нет данных: запустите generate_data.')
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if output:
+            with open(output, 'w', encoding='utf-8') as stream:
+                stream.write(text)
+        else:
+            self.stdout.write(text)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as stream:
+                baseline = json.load(stream)
+            for line in compare(baseline, report):
+                self.stderr.write(line)
@@ -0,0 +1,54 @@
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.exporter import (
+    CHUNK_SIZE, EXPORT_FORMATS, EXPORT_MODELS, iter_export
+)
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает публикации или комментарии в JSONL или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=sorted(EXPORT_MODELS))
+        parser.add_argument(
+            '--format', dest='export_format', choices=EXPORT_FORMATS,
+            default='jsonl',
+        )
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument(
+            '--output', '-o',
+            help='Путь к файлу; по умолчанию выгрузка пишется в stdout.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, table, export_format, gzip, output, chunk_size,
+               **options):
+        chunks = iter_export(table, export_format, gzip, chunk_size)
+        if output is None:
+            self._write_stdout(chunks, gzip)
+            return
+        with open(output, 'wb') as stream:
+            self._write(chunks, stream)
+
+    def _write_stdout(self, chunks, gzip):
+        # Байты идут в буфер self.stdout, если он есть: так работают
+        # перенаправление и call_command(stdout=...).
+        stream = self.stdout._out
+        stream = getattr(stream, 'buffer', stream)
+        if not isinstance(stream, io.TextIOBase):
+            self._write(chunks, stream)
+            return
+        if gzip:
+            raise CommandError(
+                'Сжатую выгрузку нельзя вывести в текстовый поток; '
+                'укажите --output.'
+            )
+        # Куски состоят из целых строк и не режут символы UTF-8.
+        self._write((chunk.decode() for chunk in chunks), stream)
+
+    def _write(self, chunks, stream):
+        for chunk in chunks:
+            stream.write(chunk)
+        stream.flush()
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from blog.importer import import_objects
+from blog.synthetic import SyntheticData
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими авторами, категориями, местами, '
+        'публикациями и комментариями с перекосом как в живом блоге.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--authors', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument(
+            '--comments-per-post', type=float, default=3,
+            help='Среднее число комментариев к публикации.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=3650,
+            help='За сколько дней назад разбросать даты публикаций.'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, batch_size, **options):
+        data = SyntheticData(
+            seed=options['seed'],
+            authors=options['authors'],
+            categories=options['categories'],
+            locations=options['locations'],
+            posts=options['posts'],
+            comments_per_post=options['comments_per_post'],
+            days=options['days'],
+        )
+        counts = import_objects(data, batch_size=batch_size)
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
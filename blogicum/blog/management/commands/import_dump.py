@@ -0,0 +1,45 @@
+import gzip
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError
+
+from blog.importer import import_dump
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает дамп dumpdata (db.json или .json.gz): '
+        'пользователей, категории, места, публикации и комментарии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, path, batch_size, database, **options):
+        opener = gzip.open if path.endswith('.gz') else open
+        try:
+            with opener(path, 'rt', encoding='utf-8') as stream:
+                counts, skipped = import_dump(
+                    stream, batch_size=batch_size, using=database
+                )
+        except (
+            OSError, ValueError, DeserializationError, IntegrityError
+        ) as error:
+            raise CommandError(f'{path}: {error}')
+        for label, count in counts.items():
+            self.stdout.write(f'{label}: {count}')
+        if skipped:
+            self.stdout.write(f'Пропущено записей: {sum(skipped.values())}')
+        if counts['blog.Post'] or counts['blog.Comment']:
+            call_command(
+                'reconcile_comment_counts', batch_size=batch_size,
+                stdout=self.stdout,
+            )
+        if counts['blog.Post']:
+            self.stdout.write(
+                'Копии фото создаёт команда make_image_renditions.'
+            )
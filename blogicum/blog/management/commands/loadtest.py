@@ -0,0 +1,89 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.benchmark import compare
+from blog.loadtest import DEFAULT_MIX, SERVERS, parse_mix, run_load_test
+
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает WSGI- или ASGI-приложение из нескольких потоков, '
+        'задач или процессов и выводит в JSON гистограммы задержек, '
+        'долю ошибок и число блокировок SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mix', default=','.join(
+                f'{name}={weight}' for name, weight in DEFAULT_MIX.items()
+            ),
+            help='Доли сценариев feed, detail и comment.'
+        )
+        parser.add_argument(
+            '--server', choices=SERVERS, default='wsgi',
+            help='asgi включает асинхронные представления чтения.'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Потоков на процесс; для asgi — одновременных задач.'
+        )
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument(
+            '--duration', type=float, default=10.0,
+            help='Длительность прогона в секундах.'
+        )
+        parser.add_argument(
+            '--requests', type=int,
+            help='Не больше запросов на каждый поток.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--sqlite-profile', choices=('default', 'tuned'),
+            help='Прогнать с умолчаниями SQLite или с SQLITE_PRAGMAS '
+                 'и CONN_MAX_AGE из настроек.'
+        )
+        parser.add_argument('--output', '-o', help='Файл для сводки.')
+        parser.add_argument(
+            '--compare', help='Сводка прошлого прогона для сравнения p95.'
+        )
+
+    def handle(self, *args, mix, threads, processes, duration, requests,
+               seed, output, sqlite_profile, server, **options):
+        try:
+            mix = parse_mix(mix)
+        except ValueError as error:
+            raise CommandError(error)
+        if threads < 1 or processes < 1:
+            raise CommandError('Нужен хотя бы один поток и один процесс.')
+        if (
+            processes > 1
+            and settings.CACHES['default']['BACKEND'] == LOCAL_CACHE_BACKEND
+        ):
+            self.stderr.write(
+                'LocMemCache у каждого процесса свой: страницы после записи '
+                'в другом процессе остаются устаревшими до таймаута.'
+            )
+        report = run_load_test(
+            mix, threads, processes, duration, requests, seed,
+            sqlite_profile, server,
+        )
+        if report is None:
+            raise CommandError('Нет данных: запустите generate_data.')
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if output:
+            with open(output, 'w', encoding='utf-8') as stream:
+                stream.write(text)
+        else:
+            self.stdout.write(text)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as stream:
+                baseline = json.load(stream)
+            for line in compare(
+                {'routes': baseline['scenarios']},
+                {'routes': report['scenarios']},
+            ):
+                self.stderr.write(line)
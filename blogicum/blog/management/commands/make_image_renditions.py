@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+from blog.caching import bump_feed_version, bump_post_card_version
+from blog.images import delete_renditions, make_renditions
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии, превью и размеры фото '
+        'для уже загруженных публикаций.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии, даже если они уже есть.'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, force, batch_size, **options):
+        posts = (
+            Post.objects.exclude(image='')
+            .only('pk', 'image', 'image_renditions')
+            .order_by('pk')
+        )
+        done = failed = 0
+        for post in posts.iterator(chunk_size=batch_size):
+            renditions = post.image_renditions or {}
+            if (
+                not force
+                and renditions.get('source') == post.image.name
+                and 'placeholder' in renditions
+            ):
+                continue
+            try:
+                delete_renditions(renditions)
+                renditions = make_renditions(post.image.name)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'{post.image.name}: {error}')
+                continue
+            Post.objects.filter(pk=post.pk).update(
+                image_renditions=renditions
+            )
+            done += 1
+        if done:
+            # update() не меняет updated_at: карточки и страницы со старой
+            # разметкой фото сбрасываются через версии.
+            bump_post_card_version()
+            bump_feed_version()
+        self.stdout.write(f'Обработано: {done}, с ошибками: {failed}')
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+def actual_comment_counts():
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по таблице комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        stale = (
+            Post.objects.annotate(actual=actual_comment_counts())
+            .exclude(comment_count=F('actual'))
+            .values_list('pk', 'actual')
+        )
+        batch = []
+        fixed = 0
+        for pk, actual in stale.iterator(chunk_size=batch_size):
+            batch.append(Post(pk=pk, comment_count=actual))
+            if len(batch) >= batch_size:
+                fixed += self._flush(batch)
+        fixed += self._flush(batch)
+        self.stdout.write(f'Исправлено публикаций: {fixed}')
+
+    def _flush(self, batch):
+        Post.objects.bulk_update(batch, ['comment_count'])
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,38 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutgoingEmail пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а опрашивать очередь каждые --interval с.'
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, batch_size, loop, interval, **options):
+        total = 0
+        # Одно соединение с почтовым бэкендом на все пачки.
+        with get_connection() as connection:
+            while True:
+                try:
+                    sent = send_pending(connection, batch_size=batch_size)
+                except Exception as error:
+                    if not loop:
+                        raise CommandError(f'Ошибка отправки: {error}')
+                    self.stderr.write(f'Ошибка отправки: {error}')
+                    sent = 0
+                total += sent
+                if sent == batch_size:
+                    continue
+                if not loop:
+                    break
+                time.sleep(interval)
+        self.stdout.write(f'Отправлено писем: {total}')
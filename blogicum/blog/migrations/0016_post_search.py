@@ -0,0 +1,70 @@
+from django.db import migrations
+
+COMMENTS_OF = (
+    "coalesce((SELECT group_concat(text, ' ') FROM blog_comment "
+    "WHERE post_id = {post}), '')"
+)
+
+FORWARD_SQL = [
+    "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+    "title, text, comments, tokenize = 'unicode61 remove_diacritics 2')",
+    "INSERT INTO blog_post_fts(rowid, title, text, comments) "
+    "SELECT id, title, text, " + COMMENTS_OF.format(post='blog_post.id')
+    + " FROM blog_post",
+    "CREATE TRIGGER blog_post_fts_insert AFTER INSERT ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(rowid, title, text, comments) "
+    "VALUES (new.id, new.title, new.text, "
+    + COMMENTS_OF.format(post='new.id') + "); END",
+    "CREATE TRIGGER blog_post_fts_update AFTER UPDATE OF title, text "
+    "ON blog_post WHEN old.title IS NOT new.title "
+    "OR old.text IS NOT new.text BEGIN "
+    "UPDATE blog_post_fts SET title = new.title, text = new.text "
+    "WHERE rowid = new.id; END",
+    "CREATE TRIGGER blog_post_fts_delete AFTER DELETE ON blog_post BEGIN "
+    "DELETE FROM blog_post_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER blog_comment_fts_insert AFTER INSERT ON blog_comment "
+    "BEGIN UPDATE blog_post_fts SET comments = "
+    + COMMENTS_OF.format(post='new.post_id')
+    + " WHERE rowid = new.post_id; END",
+    "CREATE TRIGGER blog_comment_fts_update AFTER UPDATE OF text, post_id "
+    "ON blog_comment BEGIN UPDATE blog_post_fts SET comments = "
+    + COMMENTS_OF.format(post='blog_post_fts.rowid')
+    + " WHERE rowid IN (old.post_id, new.post_id); END",
+    "CREATE TRIGGER blog_comment_fts_delete AFTER DELETE ON blog_comment "
+    "BEGIN UPDATE blog_post_fts SET comments = "
+    + COMMENTS_OF.format(post='old.post_id')
+    + " WHERE rowid = old.post_id; END",
+]
+
+BACKWARD_SQL = [
+    'DROP TRIGGER IF EXISTS blog_comment_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_update',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_post_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_post_fts_update',
+    'DROP TRIGGER IF EXISTS blog_post_fts_insert',
+    'DROP TABLE IF EXISTS blog_post_fts',
+]
+
+
+def run_sqlite(statements):
+    # FTS5 есть только в SQLite; на других СУБД поиск работает без индекса.
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_image_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_sqlite(FORWARD_SQL), run_sqlite(BACKWARD_SQL)
+        ),
+    ]
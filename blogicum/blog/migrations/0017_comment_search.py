@@ -0,0 +1,71 @@
+from importlib import import_module
+
+from django.db import migrations
+
+post_search = import_module('blog.migrations.0016_post_search')
+
+TOKENIZE = "tokenize = 'unicode61 remove_diacritics 2'"
+
+# Каждый комментарий — отдельная строка индекса с rowid = id комментария,
+# поэтому запись комментария не пересобирает остальные комментарии
+# публикации.
+FORWARD_SQL = [
+    'DROP TRIGGER IF EXISTS blog_comment_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_update',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_post_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_post_fts_update',
+    'DROP TRIGGER IF EXISTS blog_post_fts_insert',
+    'DROP TABLE IF EXISTS blog_post_fts',
+    f'CREATE VIRTUAL TABLE blog_post_fts USING fts5(title, text, {TOKENIZE})',
+    'INSERT INTO blog_post_fts(rowid, title, text) '
+    'SELECT id, title, text FROM blog_post',
+    'CREATE TRIGGER blog_post_fts_insert AFTER INSERT ON blog_post BEGIN '
+    'INSERT INTO blog_post_fts(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+    'CREATE TRIGGER blog_post_fts_update AFTER UPDATE OF title, text '
+    'ON blog_post WHEN old.title IS NOT new.title '
+    'OR old.text IS NOT new.text BEGIN '
+    'UPDATE blog_post_fts SET title = new.title, text = new.text '
+    'WHERE rowid = new.id; END',
+    'CREATE TRIGGER blog_post_fts_delete AFTER DELETE ON blog_post BEGIN '
+    'DELETE FROM blog_post_fts WHERE rowid = old.id; END',
+    'CREATE VIRTUAL TABLE blog_comment_fts USING fts5('
+    f"text, content = 'blog_comment', content_rowid = 'id', {TOKENIZE})",
+    "INSERT INTO blog_comment_fts(blog_comment_fts) VALUES ('rebuild')",
+    'CREATE TRIGGER blog_comment_fts_insert AFTER INSERT ON blog_comment '
+    'BEGIN INSERT INTO blog_comment_fts(rowid, text) '
+    'VALUES (new.id, new.text); END',
+    'CREATE TRIGGER blog_comment_fts_update AFTER UPDATE OF text '
+    'ON blog_comment WHEN old.text IS NOT new.text BEGIN '
+    'INSERT INTO blog_comment_fts(blog_comment_fts, rowid, text) '
+    "VALUES ('delete', old.id, old.text); "
+    'INSERT INTO blog_comment_fts(rowid, text) '
+    'VALUES (new.id, new.text); END',
+    'CREATE TRIGGER blog_comment_fts_delete AFTER DELETE ON blog_comment '
+    'BEGIN INSERT INTO blog_comment_fts(blog_comment_fts, rowid, text) '
+    "VALUES ('delete', old.id, old.text); END",
+]
+
+BACKWARD_SQL = [
+    'DROP TRIGGER IF EXISTS blog_comment_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_update',
+    'DROP TRIGGER IF EXISTS blog_comment_fts_insert',
+    'DROP TABLE IF EXISTS blog_comment_fts',
+    *post_search.BACKWARD_SQL,
+    *post_search.FORWARD_SQL,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            post_search.run_sqlite(FORWARD_SQL),
+            post_search.run_sqlite(BACKWARD_SQL),
+        ),
+    ]
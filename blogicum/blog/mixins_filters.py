@@ -1,5 +1,6 @@
+from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.db.models import Count
+from django.db.models import Q
 from django.utils import timezone
 from django.urls import reverse
 from django.shortcuts import get_object_or_404
@@ -8,11 +9,54 @@ from django.shortcuts import get_object_or_404
 from blog.models import Comment, Post
 
 
-class OnlyAuthorMixin(UserPassesTestMixin):
+def get_request_object_or_404(request, model, **lookup):
+    """get_object_or_404 с картой идентичности на время запроса.
+
+    Повторный поиск того же объекта в рамках одного запроса возвращает
+    тот же экземпляр без обращения к базе.
+    """
+    identity_map = request.__dict__.setdefault('_identity_map', {})
+    user = getattr(request, 'user', None)
+    if (
+        model is get_user_model()
+        and user is not None
+        and user.is_authenticated
+        and all(getattr(user, key, None) == value
+                for key, value in lookup.items())
+    ):
+        return user
+    key = (model._meta.label, tuple(sorted(lookup.items())))
+    if key not in identity_map:
+        identity_map[key] = get_object_or_404(model, **lookup)
+    return identity_map[key]
+
+
+class IdentityMapMixin:
+
+    def get_cached_object_or_404(self, model, **lookup):
+        return get_request_object_or_404(self.request, model, **lookup)
+
+
+class CachedObjectMixin:
+    """Загружает объект один раз за запрос.
+
+    Проверки доступа и generic-представления обращаются к get_object()
+    несколько раз; повторные вызовы возвращают уже загруженный объект.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object_cache'):
+            self._object_cache = super().get_object()
+        return self._object_cache
+
+
+class OnlyAuthorMixin(CachedObjectMixin, UserPassesTestMixin):
 
     def test_func(self):
         object = self.get_object()
-        return object.author == self.request.user
+        return object.author_id == self.request.user.pk
 
 
 class CommentMixin(OnlyAuthorMixin):
@@ -25,33 +69,39 @@ class CommentMixin(OnlyAuthorMixin):
             'blog:post_detail', kwargs={'post_id': self.kwargs['post_id']}
         )
 
-    def get_object(self, queryset=None):
-        comment_id = self.kwargs[self.pk_url_kwarg]
-        post_id = self.kwargs['post_id']
-        comment = get_object_or_404(
-            self.get_queryset(),
-            id=comment_id,
-            post_id=post_id
-        )
-        return comment
+    def get_queryset(self):
+        return super().get_queryset().filter(post_id=self.kwargs['post_id'])
+
+
+def published_posts_filter(published_before=None):
+    # published_before сужает границу «уже опубликовано» (см.
+    # KeysetPaginationMixin.get_keyset_bound).
+    return Q(
+        pub_date__lte=published_before or timezone.now(),
+        is_published=True,
+        category__is_published=True
+    )
+
+
+def visible_posts_filter(user):
+    # Автор видит свои публикации независимо от флагов и даты.
+    if user.is_authenticated:
+        return published_posts_filter() | Q(author=user)
+    return published_posts_filter()
 
 
 def filter_posts(
-        manager=Post.objects, apply_filters=True, add_annotations=False
+        manager=Post.objects, apply_filters=True, add_annotations=False,
+        published_before=None
 ):
 
     queryset = manager.select_related('author', 'location', 'category')
 
     if apply_filters:
-        queryset = queryset.filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True
-        )
+        queryset = queryset.filter(published_posts_filter(published_before))
 
     if add_annotations:
-        queryset = queryset.annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
+        # comment_count хранится в Post и обновляется сигналами.
+        queryset = queryset.order_by('-pub_date')
 
     return queryset
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.urls import reverse
 
 LONG_TEXT_LENGTH = 256
@@ -87,12 +89,53 @@ class Post(PublishedModel):
         verbose_name='Категория'
     )
     image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    image_renditions = models.JSONField(
+        'Уменьшенные копии фото', default=dict, blank=True, editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False
+    )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        # Частичные индексы под условие видимости из filter_posts():
+        # is_published приходит в SQL без сравнения и не может быть
+        # префиксом составного индекса.
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                condition=models.Q(is_published=True),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        )
+
+    def save(self, *args, **kwargs):
+        # comment_count меняют только сигналы комментариев через F():
+        # обычное сохранение загруженной ранее публикации затёрло бы
+        # комментарии, добавленные после её чтения.
+        if (
+            not self._state.adding and self.pk is not None
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'comment_count'
+            ]
+        super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         # С помощью функции reverse() возвращаем URL объекта.
@@ -101,6 +144,42 @@ class Post(PublishedModel):
     def __str__(self):
         return self.title[:TEXT_LENGTH]
 
+    def image_rendition_urls(self):
+        widths = self.image_renditions.get('widths', {})
+        return [
+            (int(width), default_storage.url(name))
+            for width, name in sorted(
+                widths.items(), key=lambda item: int(item[0])
+            )
+        ]
+
+    @property
+    def image_srcset(self):
+        return ', '.join(
+            f'{url} {width}w' for width, url in self.image_rendition_urls()
+        )
+
+    @property
+    def image_preview_url(self):
+        # Самая крупная копия не шире карточки, иначе оригинал.
+        fitting = [
+            url for width, url in self.image_rendition_urls()
+            if width <= settings.POST_IMAGE_CARD_WIDTH
+        ]
+        return fitting[-1] if fitting else self.image.url
+
+    @property
+    def image_width(self):
+        return self.image_renditions.get('width')
+
+    @property
+    def image_height(self):
+        return self.image_renditions.get('height')
+
+    @property
+    def image_placeholder(self):
+        return self.image_renditions.get('placeholder', '')
+
 
 class Comment(models.Model):
     text = models.TextField('Комментарий')
@@ -119,8 +198,48 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (transactional outbox)."""
+
+    subject = models.CharField('Тема', max_length=LONG_TEXT_LENGTH)
+    message = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    recipients = models.TextField(
+        'Получатели', help_text='Адреса через запятую.'
+    )
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        indexes = (
+            models.Index(
+                fields=('id',),
+                condition=models.Q(sent_at__isnull=True),
+                name='outgoing_email_pending_idx',
+            ),
+        )
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self):
+        return self.subject[:TEXT_LENGTH]
+
+    @property
+    def recipient_list(self):
+        return [email for email in self.recipients.split(',') if email]
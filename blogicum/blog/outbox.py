@@ -0,0 +1,63 @@
+from django.core.mail import EmailMessage
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import OutgoingEmail
+
+MAX_ATTEMPTS = 5
+
+
+def queue_email(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь; вызывать внутри транзакции записи."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipients=','.join(recipient_list),
+    )
+
+
+def queue_comment_notification(comment):
+    return queue_email(
+        subject='Another Beatles member',
+        message=f'{comment.text} пытался написать коммент!',
+        from_email='birthday_form@acme.not',
+        recipient_list=['admin@acme.not'],
+    )
+
+
+def send_pending(connection, batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """Отправляет одну пачку писем через открытое соединение.
+
+    Возвращает число отправленных писем. При ошибке бэкенда у всей
+    пачки увеличивается счётчик попыток, а исключение пробрасывается.
+    """
+    batch = list(
+        OutgoingEmail.objects.filter(
+            sent_at__isnull=True, attempts__lt=max_attempts
+        )[:batch_size]
+    )
+    if not batch:
+        return 0
+    pks = [email.pk for email in batch]
+    messages = [
+        EmailMessage(
+            email.subject,
+            email.message,
+            email.from_email,
+            email.recipient_list,
+            connection=connection,
+        )
+        for email in batch
+    ]
+    try:
+        connection.send_messages(messages)
+    except Exception as error:
+        OutgoingEmail.objects.filter(pk__in=pks).update(
+            attempts=F('attempts') + 1, last_error=str(error)
+        )
+        raise
+    OutgoingEmail.objects.filter(pk__in=pks).update(
+        attempts=F('attempts') + 1, sent_at=timezone.now(), last_error=''
+    )
+    return len(batch)
@@ -0,0 +1,282 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from blog.caching import (
+    check_publication_boundary, get_post_count_version,
+    publication_aware_timeout
+)
+from blog.routers import primary_reads
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(obj, field='pub_date'):
+    raw = f'{getattr(obj, field).isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.split('|')
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise InvalidCursor(cursor)
+    if value is None:
+        raise InvalidCursor(cursor)
+    return value, pk
+
+
+class KeysetPage:
+    """Страница, построенная по курсору (поле даты, id)."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self)} objects>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[0])
+        return None
+
+
+class KeysetPaginator:
+    """Пагинация без OFFSET: фильтрация по ключу (поле даты, id).
+
+    Стоимость страницы не зависит от её глубины, так как запрос
+    читает только per_page + 1 строк по индексу.
+    """
+
+    ordering = ('-pub_date', '-id')
+
+    def __init__(self, queryset, per_page, ordering=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        if ordering is not None:
+            self.ordering = ordering
+        self.field = self.ordering[0].lstrip('-')
+        self.descending = self.ordering[0].startswith('-')
+
+    def encode_cursor(self, obj):
+        return encode_cursor(obj, self.field)
+
+    def _beyond(self, cursor, forward):
+        value, pk = decode_cursor(cursor)
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def page(self, after=None, before=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        if before is not None:
+            rows = list(
+                queryset.filter(self._beyond(before, forward=False))
+                .reverse()[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return KeysetPage(rows, self, True, has_previous)
+        if after is not None:
+            queryset = queryset.filter(self._beyond(after, forward=True))
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return KeysetPage(
+            rows[:self.per_page], self, has_next, after is not None
+        )
+
+
+class CommentKeysetPaginator(KeysetPaginator):
+    ordering = ('created_at', 'id')
+
+
+def get_keyset_page(paginator, request):
+    try:
+        return paginator.page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+    except InvalidCursor:
+        raise Http404('Неверный курсор страницы.')
+
+
+class KeysetPaginationMixin:
+    """Включает курсорную пагинацию для ListView.
+
+    Режим включается атрибутом keyset_pagination; курсоры передаются
+    в GET-параметрах after и before.
+    """
+
+    keyset_pagination = False
+    keyset_paginator_class = KeysetPaginator
+
+    def get_keyset_bound(self):
+        """Верхняя граница pub_date для ленты после курсора after.
+
+        SQLite берёт для поиска по индексу первую из нескольких границ
+        pub_date; если это «сейчас», а не курсор, глубокая страница
+        пропускает все более новые строки. Поэтому вместо now лента
+        фильтруется по min(курсор, now).
+        """
+        cursor = self.request.GET.get('after')
+        if not self.keyset_pagination or cursor is None:
+            return None
+        try:
+            value, _ = decode_cursor(cursor)
+        except InvalidCursor:
+            # Неверный курсор отклонит get_keyset_page().
+            return None
+        return min(value, timezone.now())
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = self.keyset_paginator_class(queryset, page_size)
+        page = get_keyset_page(paginator, self.request)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который не считает COUNT(*) на каждой странице.
+
+    Точное число записей кэшируется по ключу ленты и версии, которую
+    повышают сигналы при изменении публикаций и категорий. Для больших
+    лент после инвалидации используется последнее известное значение
+    как оценка, пока не истечёт estimate_timeout. Оценка может быть
+    меньше реального числа записей, поэтому страницы за её пределами
+    не отклоняются, пока на них есть записи.
+    """
+
+    def __init__(self, object_list, per_page, cache_key=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.count_timeout = settings.POSTS_COUNT_CACHE_TIMEOUT
+        self.estimate_threshold = settings.POSTS_COUNT_ESTIMATE_THRESHOLD
+        self.estimate_timeout = settings.POSTS_COUNT_ESTIMATE_TIMEOUT
+        self.estimate_recheck_timeout = (
+            settings.POSTS_COUNT_ESTIMATE_RECHECK_TIMEOUT
+        )
+        self.is_estimated = False
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return super().count
+        check_publication_boundary()
+        exact_key = (
+            f'blog:count:{get_post_count_version()}:{self.cache_key}'
+        )
+        estimate_key = f'blog:count-estimate:{self.cache_key}'
+        cached = cache.get(exact_key)
+        if cached is not None:
+            count, self.is_estimated = cached
+            return count
+        with primary_reads():
+            return self._count_and_cache(exact_key, estimate_key)
+
+    def _count_and_cache(self, exact_key, estimate_key):
+        if self.estimate_threshold is not None:
+            # Ограниченный COUNT читает не больше threshold + 1 строк.
+            capped = self.object_list[:self.estimate_threshold + 1].count()
+            if capped <= self.estimate_threshold:
+                cache.set(
+                    exact_key, (capped, False),
+                    publication_aware_timeout(self.count_timeout)
+                )
+                return capped
+            estimate = cache.get(estimate_key)
+            if estimate is not None:
+                # Без записи под exact_key ограниченный COUNT повторялся
+                # бы на каждом запросе, пока жива оценка.
+                cache.set(
+                    exact_key, (estimate, True),
+                    self.estimate_recheck_timeout
+                )
+                self.is_estimated = True
+                return estimate
+        count = super().count
+        cache.set(
+            exact_key, (count, False),
+            publication_aware_timeout(self.count_timeout)
+        )
+        cache.set(estimate_key, count, self.estimate_timeout)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # super() уже посчитал count: за пределами оценки наличие
+            # записей проверяет page().
+            if not self.is_estimated or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_estimated:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page])
+        if not object_list and number > 1:
+            raise EmptyPage('Страница не содержит результатов')
+        return self._get_page(object_list, number, self)
+
+
+class CachedCountPaginationMixin:
+    """Подключает CachedCountPaginator к ListView с paginate_by."""
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_key(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page,
+            cache_key=self.get_count_cache_key(),
+            **kwargs
+        )
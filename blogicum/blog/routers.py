@@ -0,0 +1,126 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Сессии читаются только с основной базы: иначе вход, ещё не дошедший
+# до реплики, выглядел бы как выход из системы.
+PRIMARY_ONLY_APPS = ('sessions',)
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = ContextVar('blog_replica_reads', default=False)
+_written = ContextVar('blog_written', default=None)
+
+
+def replica_alias():
+    alias = settings.REPLICA_DATABASE
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Разрешает блоку читать с реплики.
+
+    Вне такого блока (команды, сигналы, тесты) все запросы идут
+    в основную базу, поэтому отставание реплики им не мешает.
+    """
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def primary_reads():
+    """Блок читает только основную базу, даже внутри replica_reads().
+
+    Так читаются данные для кэшей с версиями: запись в основную базу
+    уже повысила версию, и отставшая реплика сохранила бы под новым
+    ключом старые данные до конца таймаута.
+    """
+    return replica_reads(False)
+
+
+class PrimaryReplicaRouter:
+    """Чтение с реплики внутри replica_reads(), запись — в default."""
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if (
+            alias is None or not _replica_reads.get()
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+        ):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        written = _written.get()
+        if written is not None:
+            written.add(model._meta.label)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        return obj1._state.db in aliases and obj2._state.db in aliases
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схема попадает на реплику вместе с данными.
+        return db != replica_alias()
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтение безопасных запросов на реплику.
+
+    Небезопасные методы целиком работают с основной базой. Если запрос
+    что-то записал, клиент получает cookie REPLICA_PIN_COOKIE на
+    REPLICA_STICKY_SECONDS секунд, и пока она жива, его чтение тоже
+    идёт в основную базу: автор сразу видит свои правки. Данные
+    для кэшей с версиями читаются с основной базы через primary_reads().
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        written = set()
+        token = _written.set(written)
+        try:
+            with replica_reads(self.use_replica(request)):
+                response = self.get_response(request)
+        finally:
+            _written.reset(token)
+        return self.process_response(response, written)
+
+    async def __acall__(self, request):
+        written = set()
+        token = _written.set(written)
+        try:
+            with replica_reads(self.use_replica(request)):
+                response = await self.get_response(request)
+        finally:
+            _written.reset(token)
+        return self.process_response(response, written)
+
+    def use_replica(self, request):
+        return (
+            request.method in SAFE_METHODS
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+        )
+
+    def process_response(self, response, written):
+        if written - {'sessions.Session'}:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
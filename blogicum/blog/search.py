@@ -0,0 +1,173 @@
+import re
+from contextlib import contextmanager
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Expression, FloatField, Q
+from django.db.models.sql.constants import INNER
+from django.db.models.sql.datastructures import Join
+
+FTS_TABLE = 'blog_post_fts'
+COMMENT_FTS_TABLE = 'blog_comment_fts'
+# Веса bm25 для столбцов title и text публикации и для комментариев.
+BM25_WEIGHTS = (10.0, 1.0, 0.5)
+FTS_TRIGGERS_SQL = (
+    "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' "
+    "AND tbl_name IN ('blog_post', 'blog_comment') AND name LIKE '%_fts_%'"
+)
+POST_MATCHES_SQL = (
+    f'SELECT rowid AS post_id, bm25({FTS_TABLE}, '
+    f'{BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]}) AS rank '
+    f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+)
+# Публикацию поднимает лучший из её подходящих комментариев. LIMIT -1
+# не даёт SQLite развернуть подзапрос в GROUP BY, где bm25() недоступна.
+COMMENT_MATCHES_SQL = (
+    'SELECT post_id, min(rank) AS rank FROM ('
+    f'SELECT blog_comment.post_id, bm25({COMMENT_FTS_TABLE}, '
+    f'{BM25_WEIGHTS[2]}) AS rank FROM {COMMENT_FTS_TABLE} '
+    f'JOIN blog_comment ON blog_comment.id = {COMMENT_FTS_TABLE}.rowid '
+    f'WHERE {COMMENT_FTS_TABLE} MATCH %s LIMIT -1) GROUP BY post_id'
+)
+MATCHES_SQL = (
+    f'SELECT post_id, sum(rank) AS rank FROM ({POST_MATCHES_SQL} '
+    f'UNION ALL {COMMENT_MATCHES_SQL}) GROUP BY post_id'
+)
+MATCHES_ALIAS = 'search_match'
+REBUILD_SQL = (
+    f'INSERT INTO {FTS_TABLE}(rowid, title, text) '
+    'SELECT id, title, text FROM blog_post',
+    f"INSERT INTO {COMMENT_FTS_TABLE}({COMMENT_FTS_TABLE}) "
+    "VALUES ('rebuild')",
+)
+
+
+def match_expression(query):
+    """Запрос FTS5 из пользовательской строки.
+
+    Каждое слово берётся в кавычки, поэтому операторы FTS5 во вводе
+    не срабатывают; последнее слово ищется по префиксу.
+    """
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+class MatchesJoin(Join):
+    """INNER JOIN с подзапросом совпадений FTS по post_id.
+
+    ORM Django 3.2 не соединяет таблицы с подзапросом, а IN по
+    совпадениям вместе с коррелированным подзапросом для rank выполняли
+    поиск по индексу дважды, второй раз — на каждую строку.
+    """
+
+    def __init__(self, sql, params, parent_alias, table_alias=MATCHES_ALIAS,
+                 join_type=INNER):
+        self.sql = sql
+        self.params = tuple(params)
+        self.table_name = MATCHES_ALIAS
+        self.parent_alias = parent_alias
+        self.table_alias = table_alias
+        self.join_type = join_type
+        self.join_field = None
+        self.nullable = False
+        self.filtered_relation = None
+
+    def as_sql(self, compiler, connection):
+        qn = compiler.quote_name_unless_alias
+        return (
+            f'{self.join_type} ({self.sql}) {qn(self.table_alias)} '
+            f'ON ({qn(self.table_alias)}.post_id = '
+            f'{qn(self.parent_alias)}.id)'
+        ), self.params
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(
+            self.sql, self.params,
+            change_map.get(self.parent_alias, self.parent_alias),
+            change_map.get(self.table_alias, self.table_alias),
+            self.join_type,
+        )
+
+    @property
+    def identity(self):
+        return (self.__class__, self.sql, self.params, self.parent_alias)
+
+
+class MatchRank(Expression):
+    """Столбец rank присоединённых MatchesJoin совпадений."""
+
+    def __init__(self, alias):
+        super().__init__(output_field=FloatField())
+        self.alias = alias
+
+    def as_sql(self, compiler, connection):
+        return f'{compiler.quote_name_unless_alias(self.alias)}.rank', []
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(change_map.get(self.alias, self.alias))
+
+
+def search_posts(queryset, query, include_comments=None):
+    """Отбирает из queryset публикации по запросу, лучшие — первыми."""
+    if include_comments is None:
+        include_comments = settings.POSTS_SEARCH_COMMENTS
+    expression = match_expression(query)
+    if expression is None:
+        return queryset.none()
+    if connections[queryset.db].vendor != 'sqlite':
+        terms = re.findall(r'\w+', query)
+        return queryset.filter(reduce(and_, (
+            Q(title__icontains=term) | Q(text__icontains=term)
+            for term in terms
+        )))
+    # Публикации и комментарии лежат в разных индексах: совпадения
+    # собираются через UNION, ранги одной публикации складываются.
+    if include_comments:
+        matches, params = MATCHES_SQL, [expression, expression]
+    else:
+        matches, params = POST_MATCHES_SQL, [expression]
+    queryset = queryset.all()
+    query = queryset.query
+    alias = query.join(
+        MatchesJoin(matches, params, query.get_initial_alias())
+    )
+    return queryset.annotate(rank=MatchRank(alias)).order_by(
+        'rank', '-pub_date'
+    )
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        for statement in REBUILD_SQL:
+            cursor.execute(statement)
+
+
+@contextmanager
+def search_index_suspended(using=DEFAULT_DB_ALIAS):
+    """Отключает триггеры FTS на время массовой вставки.
+
+    Построчное обновление индекса на каждую вставку медленнее, чем
+    одна перестройка индекса после загрузки. Вызывать внутри
+    transaction.atomic: при ошибке откат вернёт и триггеры.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(FTS_TRIGGERS_SQL)
+        triggers = cursor.fetchall()
+        for name, _ in triggers:
+            cursor.execute(f'DROP TRIGGER {name}')
+    yield
+    if not triggers:
+        return
+    with connection.cursor() as cursor:
+        for _, sql in triggers:
+            cursor.execute(sql)
+    rebuild_search_index(using)
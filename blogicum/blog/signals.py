@@ -0,0 +1,131 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from blog.caching import (
+    bump_feed_version, bump_post_card_version, bump_post_count_version,
+    feed_scopes, forget_next_publication, post_feed_scopes
+)
+from blog.images import delete_renditions, make_renditions
+from blog.models import Category, Comment, Location, Post
+from blog.sqlite import apply_sqlite_pragmas
+
+User = get_user_model()
+
+
+def after_commit(func, *args):
+    """Откладывает сброс кэша до коммита транзакции записи.
+
+    Версия, повышенная до коммита, позволила бы параллельному запросу
+    закэшировать под новой версией ещё старые данные. Вне транзакции
+    func выполняется сразу.
+    """
+    transaction.on_commit(partial(func, *args))
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created and instance.post_id is not None:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    if instance.post_id is not None:
+        Post.objects.filter(
+            pk=instance.post_id, comment_count__gt=0
+        ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_init, sender=Post)
+def remember_feed_origin(sender, instance, **kwargs):
+    # Через __dict__, чтобы не загружать отложенные поля.
+    instance._feed_origin = (
+        instance.__dict__.get('category_id'),
+        instance.__dict__.get('author_id'),
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    # После смены категории или автора устаревают и прежние ленты.
+    category_id, author_id = instance._feed_origin
+    after_commit(bump_feed_version, *feed_scopes(
+        (category_id, instance.category_id),
+        (author_id, instance.author_id),
+    ))
+    instance._feed_origin = (instance.category_id, instance.author_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_feeds(sender, instance, **kwargs):
+    # Карточки в лентах показывают число комментариев.
+    after_commit(bump_feed_version, *post_feed_scopes(instance.post_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_post_cards(sender, **kwargs):
+    after_commit(bump_feed_version)
+    after_commit(bump_post_card_version)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_page_cache_for_user(sender, update_fields=None, **kwargs):
+    # При входе Django сохраняет только last_login — страницы не меняются.
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    after_commit(bump_feed_version)
+    after_commit(bump_post_card_version)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_post_counts(sender, **kwargs):
+    after_commit(bump_post_count_version)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reschedule_next_publication(sender, **kwargs):
+    after_commit(forget_next_publication)
+
+
+@receiver(post_save, sender=Post)
+def update_image_renditions(sender, instance, raw=False, **kwargs):
+    # loaddata не открывает картинки: копии создаст make_image_renditions.
+    if raw:
+        return
+    renditions = instance.image_renditions or {}
+    if renditions.get('source') == (instance.image.name or None):
+        return
+    delete_renditions(renditions)
+    renditions = {}
+    if instance.image:
+        try:
+            renditions = make_renditions(instance.image.name)
+        except (OSError, ValueError):
+            # Оригинал остаётся доступен; копии создаст make_image_renditions.
+            renditions = {'source': instance.image.name, 'widths': {}}
+    instance.image_renditions = renditions
+    # update() не вызывает сигналы повторно и не трогает updated_at.
+    Post.objects.filter(pk=instance.pk).update(image_renditions=renditions)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    apply_sqlite_pragmas(connection)
@@ -0,0 +1,29 @@
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+PRAGMA_VALUE = re.compile(r'-?\w+')
+
+
+def pragma_statements(pragmas):
+    for name, value in pragmas.items():
+        if not name.isidentifier() or not PRAGMA_VALUE.fullmatch(str(value)):
+            raise ImproperlyConfigured(
+                f'Неверная настройка SQLite: {name} = {value!r}.'
+            )
+        yield f'PRAGMA {name} = {value}'
+
+
+def apply_sqlite_pragmas(connection, pragmas=None):
+    """Выполняет PRAGMA из настроек на новом соединении с SQLite.
+
+    Команды идут мимо курсоров Django, поэтому не попадают
+    в счётчики запросов и бюджеты QUERY_BUDGETS.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    if pragmas is None:
+        pragmas = settings.SQLITE_PRAGMAS
+    for statement in pragma_statements(pragmas):
+        connection.connection.execute(statement).fetchall()
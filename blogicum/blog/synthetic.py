@@ -0,0 +1,158 @@
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.models import User
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from blog.models import Category, Comment, Location, Post
+
+POOL_SIZE = 500
+# Параметр Парето: чем меньше, тем длиннее хвост распределения.
+AUTHOR_SKEW = 1.2
+COMMENT_SKEW = 1.5
+CATEGORY_SKEW = 1.1
+MAX_COMMENTS_PER_POST = 5000
+SCHEDULED_SHARE = 0.01
+HIDDEN_SHARE = 0.03
+NO_LOCATION_SHARE = 0.3
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def zipf_weights(count, skew):
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+class SyntheticData:
+    """Детерминированный генератор публикаций с реалистичным перекосом.
+
+    Число публикаций у авторов и комментариев у публикаций распределено
+    по Парето, размеры категорий и мест — по Ципфу. Тексты берутся
+    из заранее созданного пула Faker, чтобы миллион строк строился
+    за минуты. Одинаковый seed даёт одинаковые данные.
+    """
+
+    def __init__(self, seed=0, authors=100, categories=10, locations=20,
+                 posts=1000, comments_per_post=3, days=3650):
+        self.random = random.Random(seed)
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(seed)
+        self.authors = authors
+        self.categories = categories
+        self.locations = locations
+        self.posts = posts
+        self.comments_per_post = comments_per_post
+        self.days = days
+        self.now = timezone.now()
+        self.titles = [
+            self.fake.sentence(nb_words=4).rstrip('.')
+            for _ in range(POOL_SIZE)
+        ]
+        self.texts = [
+            self.fake.paragraph(nb_sentences=5) for _ in range(POOL_SIZE)
+        ]
+        self.phrases = [self.fake.sentence() for _ in range(POOL_SIZE)]
+
+    def __iter__(self):
+        authors = list(self.make_authors())
+        categories = list(self.make_categories())
+        locations = list(self.make_locations())
+        yield from authors
+        yield from categories
+        yield from locations
+        author_weights = list(accumulate(
+            self.random.paretovariate(AUTHOR_SKEW) for _ in authors
+        ))
+        category_weights = zipf_weights(len(categories), CATEGORY_SKEW)
+        location_weights = zipf_weights(len(locations), CATEGORY_SKEW)
+        post_pk, comment_pk = next_pk(Post), next_pk(Comment)
+        for pk in range(post_pk, post_pk + self.posts):
+            post = self.make_post(
+                pk,
+                self.random.choices(authors, cum_weights=author_weights)[0],
+                self.random.choices(
+                    categories, cum_weights=category_weights
+                )[0],
+                None if self.random.random() < NO_LOCATION_SHARE
+                else self.random.choices(
+                    locations, cum_weights=location_weights
+                )[0],
+            )
+            yield post
+            for _ in range(post.comment_count):
+                yield self.make_comment(
+                    comment_pk, post,
+                    self.random.choices(authors, cum_weights=author_weights)[0]
+                )
+                comment_pk += 1
+
+    def make_authors(self):
+        start = next_pk(User)
+        for pk in range(start, start + self.authors):
+            yield User(
+                pk=pk,
+                username=f'{self.fake.user_name()}_{pk}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                password='!',
+                date_joined=self.now,
+            )
+
+    def make_categories(self):
+        start = next_pk(Category)
+        for pk in range(start, start + self.categories):
+            yield Category(
+                pk=pk,
+                title=self.fake.word().capitalize(),
+                description=self.random.choice(self.phrases),
+                slug=f'category-{pk}',
+                is_published=True,
+            )
+
+    def make_locations(self):
+        start = next_pk(Location)
+        for pk in range(start, start + self.locations):
+            yield Location(pk=pk, name=self.fake.city(), is_published=True)
+
+    def make_post(self, pk, author, category, location):
+        if self.random.random() < SCHEDULED_SHARE:
+            pub_date = self.now + timedelta(
+                seconds=self.random.randint(60, 30 * 86400)
+            )
+        else:
+            pub_date = self.now - timedelta(
+                seconds=self.random.randint(0, self.days * 86400)
+            )
+        comments = int(
+            self.random.paretovariate(COMMENT_SKEW)
+            * self.comments_per_post * (COMMENT_SKEW - 1) / COMMENT_SKEW
+        )
+        created_at = min(pub_date, self.now)
+        return Post(
+            pk=pk,
+            title=self.random.choice(self.titles),
+            text=self.random.choice(self.texts),
+            pub_date=pub_date,
+            author=author,
+            category=category,
+            location=location,
+            is_published=self.random.random() >= HIDDEN_SHARE,
+            comment_count=min(comments, MAX_COMMENTS_PER_POST),
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+    def make_comment(self, pk, post, author):
+        delay = timedelta(seconds=self.random.randint(0, 30 * 86400))
+        return Comment(
+            pk=pk,
+            post=post,
+            author=author,
+            text=self.random.choice(self.phrases),
+            created_at=min(post.created_at + delay, self.now),
+        )
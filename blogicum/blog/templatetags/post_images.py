@@ -0,0 +1,32 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+IMAGE_CLASSES = 'border-3 rounded img-fluid img-thumbnail mb-2 mx-auto d-block'
+CARD_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+@register.simple_tag
+def post_image(post, preview=True, lazy=True):
+    """Тег <img> с размерами, srcset и плейсхолдером для Post.image.
+
+    width/height резервируют место под фото до загрузки, поэтому
+    вёрстка не сдвигается; lazy откладывает загрузку фото за экраном.
+    """
+    src = post.image_preview_url if preview else post.image.url
+    attrs = [('class', IMAGE_CLASSES), ('src', src), ('alt', post.title)]
+    if post.image_srcset:
+        attrs += [('srcset', post.image_srcset), ('sizes', CARD_SIZES)]
+    if post.image_width and post.image_height:
+        attrs += [('width', post.image_width), ('height', post.image_height)]
+    attrs += [('loading', 'lazy' if lazy else 'eager'), ('decoding', 'async')]
+    if post.image_placeholder:
+        attrs.append((
+            'style',
+            f'background: url({post.image_placeholder}) center / cover '
+            'no-repeat',
+        ))
+    return format_html(
+        '<img {}>', format_html_join(' ', '{}="{}"', attrs)
+    )
@@ -1,13 +1,24 @@
+from django.conf import settings
 from django.urls import path, include
 
-from . import views
+from . import async_views, feeds, views
 
 app_name = 'blog'
 
+# Под ASGI ленты и страница публикации обслуживаются асинхронно.
+if settings.ASYNC_READ_VIEWS:
+    index_view = async_views.AsyncIndexView.as_view()
+    category_posts_view = async_views.AsyncCategoryPostsView.as_view()
+    post_detail_view = async_views.AsyncPostDetailView.as_view()
+else:
+    index_view = views.IndexView.as_view()
+    category_posts_view = views.CategoryPostsView.as_view()
+    post_detail_view = views.PostDetailView.as_view()
+
 post_urls = [
     path(
         '<int:post_id>/',
-        views.PostDetailView.as_view(),
+        post_detail_view,
         name='post_detail'
     ),
     path('create/', views.PostCreateView.as_view(), name='create_post'),
@@ -22,6 +33,11 @@ post_urls = [
         name='delete_post'
     ),
     path('<int:comment_id>/comment/', views.add_comment, name='add_comment'),
+    path(
+        '<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='comments'
+    ),
     path(
         '<int:post_id>/delete_comment/<int:comment_id>',
         views.CommentDeleteView.as_view(),
@@ -35,12 +51,33 @@ post_urls = [
 
 urlpatterns = [
     path('posts/', include(post_urls)),
-    path('', views.IndexView.as_view(), name='index'),
+    path('', index_view, name='index'),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path(
+        'feed/',
+        feeds.conditional_feed(feeds.PostsFeed()),
+        name='feed'
+    ),
+    path(
+        'feed/atom/',
+        feeds.conditional_feed(feeds.PostsAtomFeed()),
+        name='feed_atom'
+    ),
     path(
         'category/<slug:category_slug>/',
-        views.CategoryPostsView.as_view(),
+        category_posts_view,
         name='category_posts'
     ),
+    path(
+        'category/<slug:category_slug>/feed/',
+        feeds.conditional_feed(feeds.CategoryPostsFeed()),
+        name='category_feed'
+    ),
+    path(
+        'category/<slug:category_slug>/feed/atom/',
+        feeds.conditional_feed(feeds.CategoryPostsAtomFeed()),
+        name='category_feed_atom'
+    ),
     path(
         'profile/edit/',
         views.UserEditView.as_view(),
@@ -51,4 +88,16 @@ urlpatterns = [
         views.UserProfileView.as_view(),
         name='profile'
     ),
+    path(
+        'profile/<str:username>/feed/',
+        feeds.conditional_feed(feeds.AuthorPostsFeed()),
+        name='profile_feed'
+    ),
+    path(
+        'profile/<str:username>/feed/atom/',
+        feeds.conditional_feed(feeds.AuthorPostsAtomFeed()),
+        name='profile_feed_atom'
+    ),
+    path('export/<slug:table>/', views.export_table, name='export'),
+    path('debug/queries/', views.query_stats, name='query_stats'),
 ]
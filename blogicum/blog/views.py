@@ -1,16 +1,39 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.conf import settings as s
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.http import urlencode
 from django.shortcuts import get_object_or_404, render, redirect
 from django.views.generic import (
     CreateView, DeleteView, UpdateView, DetailView, ListView
 )
 
-from blog.models import Post, Category
+from blog.caching import (
+    INDEX_SCOPE, AnonymousPageCacheMixin, ConditionalGetMixin,
+    FeedConditionalGetMixin, author_scope, category_scope
+)
+from blog.exporter import (
+    EXPORT_FORMATS, EXPORT_MODELS, export_filename, iter_export
+)
+from blog.instrumentation import get_query_stats
+from blog.models import Post, Category, Comment
+from blog.outbox import queue_comment_notification
 from blog.forms import PostForm, CommentForm
-from blog.mixins_filters import OnlyAuthorMixin, CommentMixin, filter_posts
+from blog.mixins_filters import (
+    OnlyAuthorMixin, CommentMixin, IdentityMapMixin, filter_posts,
+    visible_posts_filter
+)
+from blog.paginators import (
+    CachedCountPaginationMixin, CommentKeysetPaginator,
+    KeysetPaginationMixin, get_keyset_page
+)
+from blog.search import search_posts
 
 
 @login_required
@@ -21,32 +44,78 @@ def add_comment(request, comment_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        with transaction.atomic():
+            comment.save()
+            queue_comment_notification(comment)
     else:
         return render(request, 'blog/comment.html',
                       {'form': form, 'post': post})
     return redirect('blog:post_detail', post_id=comment_id)
 
 
-class IndexView(ListView):
+EXPORT_CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+@staff_member_required
+def export_table(request, table):
+    export_format = request.GET.get('format', 'jsonl')
+    if table not in EXPORT_MODELS or export_format not in EXPORT_FORMATS:
+        raise Http404('Неизвестная таблица или формат выгрузки.')
+    compress = request.GET.get('gzip') == '1'
+    response = StreamingHttpResponse(
+        iter_export(table, export_format, compress),
+        content_type=(
+            'application/gzip' if compress
+            else EXPORT_CONTENT_TYPES[export_format]
+        ),
+    )
+    filename = export_filename(table, export_format, compress)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@staff_member_required
+def query_stats(request):
+    return JsonResponse(get_query_stats(), json_dumps_params={'indent': 2})
+
+
+class IndexView(
+    FeedConditionalGetMixin, AnonymousPageCacheMixin,
+    CachedCountPaginationMixin, KeysetPaginationMixin, ListView
+):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = s.POSTS_LIMIT
+    keyset_pagination = s.POSTS_KEYSET_PAGINATION
 
     def get_queryset(self):
         return filter_posts(
             apply_filters=True,
-            add_annotations=True
+            add_annotations=True,
+            published_before=self.get_keyset_bound()
         )
 
+    def get_count_cache_key(self):
+        return 'index'
+
+    def get_feed_scope(self):
+        return INDEX_SCOPE
+
 
-class CategoryPostsView(ListView):
+class CategoryPostsView(
+    FeedConditionalGetMixin, AnonymousPageCacheMixin, IdentityMapMixin,
+    CachedCountPaginationMixin, KeysetPaginationMixin, ListView
+):
     model = Post
     template_name = 'blog/category.html'
     paginate_by = s.POSTS_LIMIT
+    keyset_pagination = s.POSTS_KEYSET_PAGINATION
 
     def get_category(self):
-        return get_object_or_404(
+        return self.get_cached_object_or_404(
             Category,
             slug=self.kwargs['category_slug'],
             is_published=True
@@ -57,9 +126,16 @@ class CategoryPostsView(ListView):
         return filter_posts(
             manager=selected_category.posts,
             apply_filters=True,
-            add_annotations=True
+            add_annotations=True,
+            published_before=self.get_keyset_bound()
         ).order_by('-pub_date')
 
+    def get_count_cache_key(self):
+        return f'category:{self.get_category().pk}'
+
+    def get_feed_scope(self):
+        return category_scope(self.kwargs['category_slug'])
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         category = self.get_category()
@@ -67,6 +143,23 @@ class CategoryPostsView(ListView):
         return context
 
 
+class SearchView(AnonymousPageCacheMixin, ListView):
+    template_name = 'blog/search.html'
+    paginate_by = s.POSTS_LIMIT
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search_posts(
+            filter_posts(apply_filters=True), self.query
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['page_query'] = urlencode({'q': self.query}) + '&'
+        return context
+
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
@@ -82,30 +175,91 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         )
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ConditionalGetMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
     post_key = 'post_id'
     pk_url_kwarg = 'post_id'
 
+    def get_validator_state(self):
+        posts = Post.objects.filter(
+            visible_posts_filter(self.request.user),
+            id=self.kwargs[self.pk_url_kwarg]
+        ).annotate(latest_comment=Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by('-created_at').values('created_at')[:1]
+        ))
+        meta = self.request.META
+        if 'HTTP_IF_NONE_MATCH' in meta or 'HTTP_IF_MODIFIED_SINCE' in meta:
+            state = posts.values_list(
+                'updated_at', 'comment_count', 'latest_comment'
+            ).first()
+        else:
+            # Без валидаторов в запросе ответ будет 200: публикация
+            # читается целиком сразу и достаётся get_object().
+            self.validated_post = posts.select_related(
+                'author', 'location', 'category'
+            ).first()
+            state = self.validated_post and (
+                self.validated_post.updated_at,
+                self.validated_post.comment_count,
+                self.validated_post.latest_comment,
+            )
+        if state is None:
+            return None
+        updated_at, _, latest_comment = state
+        return state, max(updated_at, latest_comment or updated_at)
+
+    def get_comments_page(self):
+        # Страница комментариев не зависит от загруженной публикации,
+        # поэтому асинхронный вариант читает их одновременно.
+        return get_keyset_page(
+            CommentKeysetPaginator(
+                Comment.objects.filter(
+                    post_id=self.kwargs[self.pk_url_kwarg]
+                ).select_related('author'),
+                s.COMMENTS_LIMIT
+            ),
+            self.request
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author'))
+        context['comments'] = self.get_comments_page()
         return context
 
     def get_object(self, queryset=None):
-        post = get_object_or_404(
-            (filter_posts(apply_filters=False, add_annotations=False)),
+        if getattr(self, 'validated_post', None) is not None:
+            return self.validated_post
+        return get_object_or_404(
+            filter_posts(apply_filters=False, add_annotations=False).filter(
+                visible_posts_filter(self.request.user)
+            ),
             id=self.kwargs[self.pk_url_kwarg]
         )
-        if post.author != self.request.user:
-            post = get_object_or_404(
-                (filter_posts(apply_filters=True, add_annotations=False)),
-                id=self.kwargs[self.pk_url_kwarg]
-            )
-        return post
+
+
+class PostCommentsView(KeysetPaginationMixin, ListView):
+    """Следующая порция комментариев в виде HTML-фрагмента."""
+
+    template_name = 'includes/comment_list.html'
+    paginate_by = s.COMMENTS_LIMIT
+    keyset_pagination = True
+    keyset_paginator_class = CommentKeysetPaginator
+
+    def get_queryset(self):
+        self.post = get_object_or_404(
+            Post.objects.filter(visible_posts_filter(self.request.user)),
+            id=self.kwargs['post_id']
+        )
+        return self.post.comments.select_related('author')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post'] = self.post
+        context['comments'] = context['page_obj']
+        return context
 
 
 class PostUpdateView(OnlyAuthorMixin, UpdateView):
@@ -137,27 +291,42 @@ class PostDeleteView(OnlyAuthorMixin, LoginRequiredMixin, DeleteView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = self.get_object()
-        context['form'] = PostForm(instance=post)
+        context['form'] = PostForm(instance=self.object)
         return context
 
 
-class UserProfileView(ListView):
+class UserProfileView(
+    FeedConditionalGetMixin, AnonymousPageCacheMixin, IdentityMapMixin,
+    CachedCountPaginationMixin, KeysetPaginationMixin, ListView
+):
     model = Post
     template_name = 'blog/profile.html'
     paginate_by = s.POSTS_LIMIT
+    keyset_pagination = s.POSTS_KEYSET_PAGINATION
 
     def get_user(self):
-        return get_object_or_404(User, username=self.kwargs['username'])
+        return self.get_cached_object_or_404(
+            User, username=self.kwargs['username']
+        )
 
     def get_queryset(self):
         selected_user = self.get_user()
         queryset = filter_posts(
             apply_filters=selected_user != self.request.user,
-            add_annotations=True
+            add_annotations=True,
+            published_before=self.get_keyset_bound()
         ).filter(author=selected_user).order_by('-pub_date')
         return queryset
 
+    def get_count_cache_key(self):
+        # Автор видит и неопубликованные записи — у него своя длина ленты.
+        selected_user = self.get_user()
+        scope = 'own' if selected_user == self.request.user else 'public'
+        return f'profile:{selected_user.pk}:{scope}'
+
+    def get_feed_scope(self):
+        return author_scope(self.kwargs['username'])
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.get_user()
@@ -181,6 +350,16 @@ class UserEditView(LoginRequiredMixin, UpdateView):
 class CommentUpdateView(CommentMixin, OnlyAuthorMixin, UpdateView):
     form_class = CommentForm
 
+    def form_valid(self, form):
+        with transaction.atomic():
+            response = super().form_valid(form)
+            # Правка комментария меняет страницу публикации и её ETag.
+            Post.objects.filter(pk=self.object.post_id).update(
+                updated_at=timezone.now()
+            )
+            queue_comment_notification(self.object)
+        return response
+
 
 class CommentDeleteView(CommentMixin, DeleteView):
     pass
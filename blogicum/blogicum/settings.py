@@ -38,6 +38,35 @@ ALLOWED_HOSTS = [
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 LOGIN_REDIRECT_URL = 'blog:index'
 POSTS_LIMIT = 10
+COMMENTS_LIMIT = 20
+# Курсорная пагинация лент по (pub_date, id) вместо OFFSET.
+POSTS_KEYSET_PAGINATION = False
+# Искать ли по тексту комментариев к публикациям.
+POSTS_SEARCH_COMMENTS = True
+# Бюджет запросов к базе на один ответ по имени адреса (при пустом кэше).
+QUERY_BUDGETS = {
+    'blog:index': 6,
+    'blog:search': 4,
+    'blog:feed': 3,
+    'blog:feed_atom': 3,
+    'blog:category_posts': 7,
+    'blog:category_feed': 4,
+    'blog:category_feed_atom': 4,
+    'blog:profile': 6,
+    'blog:profile_feed': 4,
+    'blog:profile_feed_atom': 4,
+    'blog:edit_profile': 2,
+    'blog:post_detail': 5,
+    'blog:comments': 4,
+    'blog:create_post': 4,
+    'blog:edit_post': 5,
+    'blog:delete_post': 4,
+    'blog:add_comment': 9,
+    'blog:edit_comment': 3,
+    'blog:delete_comment': 3,
+    'blog:export': 4,
+    'blog:query_stats': 2,
+}
 
 
 # Application definition
@@ -55,6 +84,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.instrumentation.QueryStatsMiddleware',
+    'blog.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,6 +110,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.cache_versions',
             ],
         },
     },
@@ -94,9 +126,62 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение живёт между запросами, PRAGMA не повторяются.
+        'CONN_MAX_AGE': 60,
+    }
+}
+
+# Асинхронные IndexView, CategoryPostsView и PostDetailView для ASGI
+# (blog/async_views.py) и размер их пула потоков для ORM.
+ASYNC_READ_VIEWS = False
+ASYNC_ORM_THREADS = 8
+
+DATABASE_ROUTERS = ['blog.routers.PrimaryReplicaRouter']
+# Псевдоним реплики для чтения; пока его нет в DATABASES,
+# все запросы идут в default.
+REPLICA_DATABASE = 'replica'
+# Сколько секунд после записи клиент читает только из основной базы.
+REPLICA_STICKY_SECONDS = 15
+REPLICA_PIN_COOKIE = 'primary_pin'
+
+# PRAGMA для каждого нового соединения с SQLite (blog/sqlite.py).
+# В режиме WAL читатели не ждут писателя, а synchronous=NORMAL
+# вызывает fsync только при переносе журнала в базу.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    # Отрицательное значение — размер кэша страниц в КиБ (64 МБ).
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
+
+# Версии лент и карточек (blog/caching.py) хранятся в кэше. LocMemCache
+# у каждого процесса свой: повышение версии видит только процесс, где
+# была запись, остальные отдают старые страницы до истечения таймаутов.
+# Для нескольких процессов (и loadtest --processes) нужен общий бэкенд,
+# например Memcached или Redis.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Время жизни закэшированных страниц лент для анонимных пользователей.
+PAGE_CACHE_TIMEOUT = 60 * 5
+# Время жизни фрагментов includes/post_card.html.
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+# Кэш числа публикаций в лентах для пагинатора.
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 10
+# Для лент длиннее порога после изменений используется оценка
+# (последнее точное значение) вместо нового COUNT(*); None отключает оценку.
+POSTS_COUNT_ESTIMATE_THRESHOLD = 10000
+POSTS_COUNT_ESTIMATE_TIMEOUT = 60 * 30
+# Сколько оценка отдаётся без повторного ограниченного COUNT.
+POSTS_COUNT_ESTIMATE_RECHECK_TIMEOUT = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -132,6 +217,12 @@ USE_TZ = True
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Уменьшенные копии Post.image: ширины в пикселях и формат (WEBP или JPEG).
+POST_IMAGE_RENDITION_WIDTHS = (320, 640, 1280)
+POST_IMAGE_RENDITION_FORMAT = 'WEBP'
+# Ширина карточки публикации в лентах (40rem).
+POST_IMAGE_CARD_WIDTH = 640
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # Указываем директорию, в которую будут сохраняться файлы писем:
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,12 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -340,6 +347,15 @@ def squash_code(code: str) -> str:
     return result
 
 
+def count_selects(queries: List[dict], table: str) -> int:
+    """Число SELECT из таблицы table среди запросов CaptureQueriesContext."""
+    return sum(
+        1 for query in queries
+        if query["sql"].startswith("SELECT")
+        and f'FROM "{table}"' in query["sql"]
+    )
+
+
 def get_field_key(field_type: type, field: Field) -> Tuple[str, Optional[str]]:
     if field.is_relation:
         return (field_type.__name__, field.related_model.__name__)
@@ -363,6 +379,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
@@ -0,0 +1,95 @@
+import re
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+from django.urls import resolve
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.instrumentation import get_query_stats, reset_query_stats
+from blog.loadtest import async_read_views
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+CSRF_TOKEN = re.compile(r'name="csrfmiddlewaretoken" value="[^"]+"')
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(15).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(hours=hour) for hour in range(15)),
+    )
+
+
+@pytest.fixture
+def comments(mixer: Mixer, posts, user):
+    return mixer.cycle(3).blend("blog.Comment", post=posts[0], author=user)
+
+
+def async_get(client, url, **extra):
+    async def get():
+        return await client.get(url, **extra)
+
+    return async_to_sync(get)()
+
+
+def body(response):
+    return CSRF_TOKEN.sub("", response.content.decode())
+
+
+def fetch_both(url, user=None):
+    client = Client()
+    if user is not None:
+        client.force_login(user)
+    expected = client.get(url)
+    with async_read_views():
+        assert resolve(url.split("?")[0]).func.__name__ == "view"
+        async_client = AsyncClient()
+        async_client.cookies = client.cookies
+        actual = async_get(async_client, url)
+    return expected, actual
+
+
+@pytest.mark.parametrize("url", [
+    "/", "/?page=2", "/category/{category}/", "/posts/{post}/",
+])
+def test_async_pages_match_sync(url, posts, comments, user):
+    url = url.format(category=posts[0].category.slug, post=posts[0].pk)
+    for viewer in (None, user):
+        expected, actual = fetch_both(url, viewer)
+        assert actual.status_code == expected.status_code == 200
+        assert body(actual) == body(expected)
+        assert actual["ETag"] == expected["ETag"]
+
+
+@pytest.mark.parametrize("url", [
+    "/?page=99", "/?page=x", "/category/missing/", "/posts/999/",
+])
+def test_async_not_found(url, posts):
+    expected, actual = fetch_both(url)
+    assert actual.status_code == expected.status_code == 404
+
+
+def test_async_conditional_get_and_query_stats(posts):
+    url = f"/posts/{posts[0].pk}/"
+    reset_query_stats()
+    with async_read_views():
+        client = AsyncClient()
+        response = async_get(client, url)
+        assert response.status_code == 200
+        # AsyncClient в Django 3.2 берёт имена заголовков из extra как есть.
+        response = async_get(
+            client, url, **{"If-None-Match": response["ETag"]}
+        )
+    assert response.status_code == 304
+    stats = get_query_stats()["blog:post_detail"]
+    assert stats["requests"] == 2
+    # Публикация с валидаторами и страница комментариев.
+    assert stats["max_queries"] == 2
@@ -0,0 +1,76 @@
+import io
+import json
+from statistics import median
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db.models import Count, F
+
+from blog.benchmark import compare, percentile, run_benchmark
+from blog.models import Comment, Post
+from blog.synthetic import SyntheticData
+
+pytestmark = [pytest.mark.django_db]
+
+
+def describe(objects):
+    return [
+        (type(obj).__name__, obj.pk, str(obj), getattr(obj, "text", ""))
+        for obj in objects
+    ]
+
+
+def test_same_seed_gives_same_data():
+    first = describe(SyntheticData(seed=7, authors=5, posts=20))
+    second = describe(SyntheticData(seed=7, authors=5, posts=20))
+    assert first == second
+    assert first != describe(SyntheticData(seed=8, authors=5, posts=20))
+
+
+def test_generate_data_is_skewed_and_consistent():
+    call_command(
+        "generate_data", seed=1, authors=20, posts=600, stdout=io.StringIO()
+    )
+    assert Post.objects.count() == 600
+    per_author = list(
+        User.objects.annotate(total=Count("posts"))
+        .values_list("total", flat=True)
+    )
+    assert max(per_author) > 3 * median(per_author)
+    mismatched = Post.objects.annotate(
+        actual=Count("comments")
+    ).exclude(comment_count=F("actual"))
+    assert not mismatched.exists()
+    assert Comment.objects.exists()
+    post = Post.objects.first()
+    assert Post.objects.raw(
+        "SELECT rowid AS id FROM blog_post_fts WHERE rowid = %s", [post.pk]
+    )[0].pk == post.pk
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([3], 0.95) == 3
+
+
+def test_benchmark_covers_every_route(tmp_path):
+    call_command(
+        "generate_data", seed=2, authors=5, posts=50, stdout=io.StringIO()
+    )
+    report = run_benchmark(iterations=2, user=User.objects.first())
+    assert report["skipped"] == []
+    assert {"blog:index", "pages:about"} <= set(report["routes"])
+    for result in report["routes"].values():
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+        assert result["throughput_rps"] > 0
+
+    output = tmp_path / "report.json"
+    call_command(
+        "benchmark", iterations=1, only=["blog:index"], output=str(output)
+    )
+    saved = json.loads(output.read_text())
+    assert set(saved["routes"]) == {"blog:index", "blog:index?page=5"}
+    assert compare(saved, saved)[0].endswith("(+0.0%)")
@@ -0,0 +1,44 @@
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comment_writes(
+        mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_reconcile_comment_counts(mixer: Mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command("reconcile_comment_counts")
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+
+def test_post_save_keeps_concurrent_comment_count(
+        mixer: Mixer, post_with_published_location
+):
+    # Публикация загружена до комментария, сохранена — после.
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    mixer.blend("blog.Comment", post=post)
+    post.title = "Новый заголовок"
+    post.save()
+
+    post.refresh_from_db()
+    assert post.title == "Новый заголовок"
+    assert post.comment_count == 1
@@ -0,0 +1,58 @@
+import pytest
+from django.test import override_settings
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENTS_LIMIT = 5
+
+
+@pytest.fixture
+def many_comments(mixer: Mixer, post_with_published_location):
+    return mixer.cycle(COMMENTS_LIMIT * 2 + 1).blend(
+        "blog.Comment", post=post_with_published_location
+    )
+
+
+@override_settings(COMMENTS_LIMIT=COMMENTS_LIMIT)
+def test_detail_page_shows_first_batch(
+        client, post_with_published_location, many_comments
+):
+    response = client.get(f"/posts/{post_with_published_location.pk}/")
+    page = response.context["comments"]
+    assert [c.pk for c in page] == [
+        c.pk for c in many_comments[:COMMENTS_LIMIT]
+    ]
+    assert page.has_next()
+    assert "data-fragment" in response.content.decode()
+
+
+def test_fragment_endpoint_walks_thread(
+        client, post_with_published_location, many_comments, monkeypatch
+):
+    from blog.views import PostCommentsView
+
+    monkeypatch.setattr(PostCommentsView, "paginate_by", COMMENTS_LIMIT)
+    url = f"/posts/{post_with_published_location.pk}/comments/"
+    seen = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        assert "<html" not in response.content.decode()
+        page = response.context["comments"]
+        seen.extend(comment.pk for comment in page)
+        url = (
+            f"/posts/{post_with_published_location.pk}/comments/"
+            f"?after={page.next_cursor}"
+            if page.has_next() else None
+        )
+    assert seen == [comment.pk for comment in many_comments]
+
+
+def test_fragment_endpoint_respects_visibility(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.pk}/comments/").status_code == 404
@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.mark.parametrize("url", [
+    "/", "/category/{post.category.slug}/", "/profile/{post.author.username}/",
+])
+def test_lists_answer_not_modified(client, post, url,
+                                   django_assert_num_queries):
+    url = url.format(post=post)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.has_header("Last-Modified")
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+
+
+def test_list_etag_changes_with_feed(
+        client, post, mixer: Mixer, django_capture_on_commit_callbacks
+):
+    etag = client.get("/")["ETag"]
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend(
+            "blog.Post", author=post.author, category=post.category,
+            is_published=True, pub_date=timezone.now() - timedelta(hours=1),
+        )
+    assert client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_list_etag_depends_on_user(client, user_client, post):
+    etag = client.get("/")["ETag"]
+    assert user_client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_detail_not_modified_skips_page_query(
+        user_client, post, django_assert_num_queries
+):
+    url = f"/posts/{post.pk}/"
+    etag = user_client.get(url)["ETag"]
+    with django_assert_num_queries(3):
+        # Сессия, пользователь и состояние публикации.
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+def test_detail_etag_follows_comments(user_client, user, post):
+    url = f"/posts/{post.pk}/"
+    etag = user_client.get(url)["ETag"]
+    comment = Comment.objects.create(post=post, author=user, text="Первый")
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    etag = response["ETag"]
+
+    user_client.post(
+        f"/posts/{post.pk}/edit_comment/{comment.pk}", {"text": "Правка"}
+    )
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200
+
+
+def test_hidden_post_is_still_404(client, post):
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.pk}/").status_code == 404
+
+
+def test_detail_fetches_post_once(client, post, django_assert_num_queries):
+    # Состояние для валидаторов и сама публикация — один запрос,
+    # второй — страница комментариев.
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{post.pk}/")
+    assert response.status_code == 200
+    assert response.has_header("ETag")
+
+
+def test_detail_etag_changes_after_relogin(user_client, user, post):
+    # Новый вход меняет CSRF-токен в форме комментария.
+    url = f"/posts/{post.pk}/"
+    etag = user_client.get(url)["ETag"]
+    user_client.logout()
+    user_client.force_login(user)
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
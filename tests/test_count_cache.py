@@ -0,0 +1,106 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.mixins_filters import filter_posts
+from blog.paginators import CachedCountPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_queries(queries):
+    return sum(1 for query in queries if "COUNT(" in query["sql"])
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE + 2).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+    )
+
+
+def test_feed_count_is_cached_between_requests(user_client, feed_posts):
+    assert user_client.get("/").context["paginator"].count == len(feed_posts)
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get("/?page=2")
+    assert count_queries(ctx.captured_queries) == 0
+
+
+def test_post_write_invalidates_cached_count(
+        user_client, mixer: Mixer, feed_posts,
+        django_capture_on_commit_callbacks
+):
+    user_client.get("/")
+    post = feed_posts[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend(
+            "blog.Post",
+            author=post.author,
+            is_published=True,
+            category=post.category,
+        )
+    paginator = user_client.get("/").context["paginator"]
+    assert paginator.count == len(feed_posts) + 1
+
+
+@override_settings(POSTS_COUNT_ESTIMATE_THRESHOLD=5)
+def test_large_feed_falls_back_to_estimate(
+        mixer: Mixer, feed_posts, django_capture_on_commit_callbacks
+):
+    queryset = filter_posts(apply_filters=True, add_annotations=True)
+    exact = CachedCountPaginator(queryset, N_PER_PAGE, cache_key="test")
+    assert exact.count == len(feed_posts)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Post", author=feed_posts[0].author)
+    estimated = CachedCountPaginator(queryset, N_PER_PAGE, cache_key="test")
+    assert estimated.count == len(feed_posts)
+    assert estimated.is_estimated
+
+
+@override_settings(POSTS_COUNT_ESTIMATE_THRESHOLD=5)
+def test_estimate_skips_capped_count_on_next_request(
+        mixer: Mixer, feed_posts, django_capture_on_commit_callbacks
+):
+    queryset = filter_posts(apply_filters=True, add_annotations=True)
+    assert CachedCountPaginator(
+        queryset, N_PER_PAGE, cache_key="test"
+    ).count == len(feed_posts)
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Post", author=feed_posts[0].author)
+    estimated = CachedCountPaginator(queryset, N_PER_PAGE, cache_key="test")
+    assert estimated.count == len(feed_posts)
+    assert estimated.is_estimated
+
+    paginator = CachedCountPaginator(queryset, N_PER_PAGE, cache_key="test")
+    with CaptureQueriesContext(connection) as ctx:
+        assert paginator.count == len(feed_posts)
+    assert count_queries(ctx.captured_queries) == 0
+    assert paginator.is_estimated
+
+
+@override_settings(POSTS_COUNT_ESTIMATE_THRESHOLD=5)
+def test_estimate_below_real_count_serves_tail_pages(
+        user_client, mixer: Mixer, feed_posts,
+        django_capture_on_commit_callbacks
+):
+    user_client.get("/")
+    post = feed_posts[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.cycle(N_PER_PAGE).blend(
+            "blog.Post",
+            author=post.author,
+            is_published=True,
+            category=post.category,
+        )
+    response = user_client.get("/?page=3")
+    assert response.status_code == 200
+    assert response.context["paginator"].is_estimated
+    assert len(response.context["page_obj"]) == 2
+    assert user_client.get("/?page=4").status_code == 404
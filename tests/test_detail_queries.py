@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404
+from django.test import RequestFactory
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.views import PostDetailView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_detail_object(post, user):
+    request = RequestFactory().get(f"/posts/{post.pk}/")
+    request.user = user
+    view = PostDetailView()
+    view.setup(request, post_id=post.pk)
+    return view.get_object()
+
+
+@pytest.fixture
+def hidden_post(mixer: Mixer, user):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category__is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+
+
+def test_detail_is_single_query(
+        post_with_published_location, another_user,
+        django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        get_detail_object(post_with_published_location, another_user)
+
+
+def test_author_sees_hidden_post_in_one_query(
+        hidden_post, user, django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        assert get_detail_object(hidden_post, user) == hidden_post
+
+
+@pytest.mark.parametrize("viewer", ("another_user", "anonymous"))
+def test_hidden_post_is_404_for_others(hidden_post, another_user, viewer):
+    user = another_user if viewer == "another_user" else AnonymousUser()
+    with pytest.raises(Http404):
+        get_detail_object(hidden_post, user)
@@ -0,0 +1,64 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+
+from blog.exporter import iter_rows
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user, published_category):
+    return mixer.cycle(7).blend(
+        "blog.Post", author=user, category=published_category
+    )
+
+
+def test_rows_walk_table_in_chunks(posts, django_assert_num_queries):
+    with django_assert_num_queries(4):
+        rows = list(iter_rows(Post, ["id", "title"], chunk_size=3))
+    assert [row["id"] for row in rows] == sorted(post.pk for post in posts)
+
+
+def test_command_writes_gzipped_jsonl(posts, tmp_path):
+    output = tmp_path / "posts.jsonl.gz"
+    call_command("export_table", "posts", gzip=True, output=str(output))
+    with gzip.open(output, "rt", encoding="utf-8") as stream:
+        rows = [json.loads(line) for line in stream]
+    assert len(rows) == len(posts)
+    assert rows[0]["title"] == posts[0].title
+    assert isinstance(rows[0]["image_renditions"], dict)
+
+
+def test_endpoint_is_staff_only(client, user_client):
+    assert client.get("/export/posts/").status_code == 302
+    assert user_client.get("/export/posts/").status_code == 302
+
+
+def test_endpoint_streams_csv(posts, admin_client):
+    response = admin_client.get("/export/posts/?format=csv")
+    assert response.streaming
+    assert response["Content-Disposition"].endswith('posts.csv"')
+    content = b"".join(response.streaming_content).decode()
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert len(rows) == len(posts)
+    assert rows[0]["author_id"] == str(posts[0].author_id)
+    assert admin_client.get("/export/users/").status_code == 404
+
+
+def test_command_writes_to_command_stdout(posts):
+    text = io.StringIO()
+    call_command("export_table", "posts", "--format", "csv", stdout=text)
+    rows = list(csv.DictReader(io.StringIO(text.getvalue())))
+    assert len(rows) == len(posts)
+
+    binary = io.BytesIO()
+    call_command("export_table", "posts", gzip=True, stdout=binary)
+    lines = gzip.decompress(binary.getvalue()).decode().splitlines()
+    assert len(lines) == len(posts)
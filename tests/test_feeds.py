@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django.utils.http import http_date
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(days=day) for day in range(1, 4)),
+    )
+
+
+@pytest.fixture
+def hidden_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(days=1),
+    )
+
+
+@pytest.mark.parametrize("suffix", ["feed/", "feed/atom/"])
+def test_feeds_list_visible_posts(
+        client, posts, hidden_post, published_category, user, suffix
+):
+    for prefix in (
+        "/", f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ):
+        response = client.get(prefix + suffix)
+        assert response.status_code == 200
+        content = response.content.decode()
+        for post in posts:
+            assert f"/posts/{post.pk}/" in content
+        assert f"/posts/{hidden_post.pk}/" not in content
+
+
+def test_unknown_category_feed_is_404(client):
+    assert client.get("/category/missing/feed/").status_code == 404
+
+
+def test_conditional_get(
+        client, posts, django_assert_num_queries,
+        django_capture_on_commit_callbacks
+):
+    response = client.get("/feed/")
+    etag = response["ETag"]
+    assert response["Last-Modified"] == http_date(
+        max(post.updated_at for post in posts).timestamp()
+    )
+    with django_assert_num_queries(0):
+        response = client.get("/feed/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    post = Post.objects.get(pk=posts[0].pk)
+    post.title = "Новый заголовок"
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    response = client.get("/feed/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
@@ -0,0 +1,33 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import count_selects
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_category_page_loads_category_once(
+        client, post_with_published_location
+):
+    category = post_with_published_location.category
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(f"/category/{category.slug}/")
+    assert response.status_code == 200
+    assert count_selects(ctx.captured_queries, "blog_category") == 1
+
+
+def test_profile_page_loads_user_once(client, post_with_published_location):
+    author = post_with_published_location.author
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(f"/profile/{author.username}/")
+    assert response.status_code == 200
+    assert count_selects(ctx.captured_queries, "auth_user") == 1
+
+
+def test_own_profile_reuses_request_user(user_client, user):
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get(f"/profile/{user.username}/")
+    assert response.status_code == 200
+    assert response.context["profile"].pk == user.pk
+    assert count_selects(ctx.captured_queries, "auth_user") == 1
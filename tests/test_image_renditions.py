@@ -0,0 +1,107 @@
+import json
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_RENDITION_WIDTHS = (100, 200, 400)
+    settings.POST_IMAGE_CARD_WIDTH = 200
+    return tmp_path
+
+
+def make_image(width=300, height=150):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        buffer, format="JPEG"
+    )
+    return ImageFile(buffer, name="photo.jpg")
+
+
+@pytest.fixture
+def post_with_image(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        image=make_image(),
+    )
+
+
+def test_upload_creates_renditions(post_with_image, media_root):
+    renditions = post_with_image.image_renditions
+    assert renditions["source"] == post_with_image.image.name
+    assert sorted(renditions["widths"]) == ["100", "200"]
+    with Image.open(media_root / renditions["widths"]["100"]) as image:
+        assert image.size == (100, 50)
+        assert image.format == "WEBP"
+
+
+def test_card_uses_rendition(client, post_with_image):
+    content = client.get("/").content.decode()
+    assert post_with_image.image_preview_url.endswith("_200w.webp")
+    assert f'src="{post_with_image.image_preview_url}"' in content
+    assert "srcset=" in content
+
+
+def test_backfill_command(post_with_image, settings):
+    Post.objects.filter(pk=post_with_image.pk).update(image_renditions={})
+    settings.POST_IMAGE_RENDITION_FORMAT = "JPEG"
+    call_command("make_image_renditions")
+    post_with_image.refresh_from_db()
+    assert post_with_image.image_renditions["format"] == "JPEG"
+    assert len(post_with_image.image_renditions["widths"]) == 2
+
+
+def test_dimensions_and_placeholder_stored(post_with_image):
+    assert (post_with_image.image_width, post_with_image.image_height) == (
+        300, 150
+    )
+    assert post_with_image.image_placeholder.startswith(
+        "data:image/jpeg;base64,"
+    )
+
+
+def test_card_image_is_sized_and_lazy(client, post_with_image):
+    content = client.get("/").content.decode()
+    assert 'width="300" height="150"' in content
+    assert 'loading="lazy"' in content
+    assert "background: url(data:image/jpeg;base64," in content
+
+
+def test_detail_image_is_eager(client, post_with_image):
+    content = client.get(f"/posts/{post_with_image.pk}/").content.decode()
+    assert 'loading="eager"' in content
+    assert 'width="300" height="150"' in content
+
+
+def test_backfill_refreshes_cached_cards(client, post_with_image):
+    Post.objects.filter(pk=post_with_image.pk).update(image_renditions={})
+    assert "srcset=" not in client.get("/").content.decode()
+    call_command("make_image_renditions")
+    assert "srcset=" in client.get("/").content.decode()
+
+
+def test_fixture_loading_skips_renditions(post_with_image, tmp_path):
+    fixture = tmp_path / "posts.json"
+    call_command(
+        "dumpdata", "blog.Post", "--pks", str(post_with_image.pk),
+        "--output", str(fixture),
+    )
+    data = json.loads(fixture.read_text())
+    data[0]["fields"]["image_renditions"] = {}
+    fixture.write_text(json.dumps(data))
+    call_command("loaddata", str(fixture))
+    post_with_image.refresh_from_db()
+    assert post_with_image.image_renditions == {}
@@ -0,0 +1,74 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.importer import import_dump, iter_json_array
+from blog.models import Category, Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+DUMP = Path(__file__).resolve().parent.parent / "blogicum" / "db.json"
+
+
+def test_stream_parser_matches_json_load():
+    with open(DUMP, encoding="utf-8") as stream:
+        expected = json.load(stream)
+    with open(DUMP, encoding="utf-8") as stream:
+        assert list(iter_json_array(stream, chunk_size=7)) == expected
+
+
+@pytest.mark.parametrize("broken", ["", "{}", "[{}", "[{} {}]", "[1]"])
+def test_stream_parser_rejects_broken_dump(broken):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(broken)))
+
+
+def test_import_repo_dump():
+    call_command("import_dump", str(DUMP), batch_size=5, stdout=io.StringIO())
+    assert Category.objects.count() == 6
+    assert Post.objects.count() == 39
+    post = Post.objects.get(pk=1)
+    assert post.author_id == 3
+    assert post.created_at.isoformat() == "2022-12-18T23:06:18.993000+00:00"
+
+
+def test_forward_references_and_counts():
+    now = timezone.now().isoformat()
+    records = [
+        {"model": "blog.comment", "pk": 1, "fields": {
+            "text": "Первый", "post": 1, "author": 1, "created_at": now}},
+        {"model": "blog.post", "pk": 1, "fields": {
+            "title": "Пост", "text": "Текст", "pub_date": now,
+            "author": 1, "category": 1, "is_published": True}},
+        {"model": "blog.category", "pk": 1, "fields": {
+            "title": "Категория", "description": "", "slug": "cat"}},
+        {"model": "auth.user", "pk": 1, "fields": {
+            "username": "author", "password": "!"}},
+        {"model": "sessions.session", "pk": "x", "fields": {}},
+    ]
+    counts, skipped = import_dump(
+        io.StringIO(json.dumps(records)), batch_size=1
+    )
+    assert counts["blog.Comment"] == 1
+    assert skipped == {"sessions.session": 1}
+    assert Comment.objects.get().post.title == "Пост"
+    assert Post.objects.get().updated_at is not None
+
+
+def test_dangling_reference_rolls_back(tmp_path):
+    dump = tmp_path / "dump.json"
+    dump.write_text(json.dumps([
+        {"model": "blog.category", "pk": 1, "fields": {
+            "title": "Категория", "description": "", "slug": "cat"}},
+        {"model": "blog.post", "pk": 1, "fields": {
+            "title": "Пост", "text": "Текст",
+            "pub_date": timezone.now().isoformat(),
+            "author": 42, "category": 1}},
+    ]))
+    with pytest.raises(CommandError):
+        call_command("import_dump", str(dump), stdout=io.StringIO())
+    assert not Category.objects.exists()
@@ -0,0 +1,76 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.loadtest import parse_mix, run_load_test
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def generated_data():
+    call_command(
+        "generate_data", seed=3, authors=5, posts=30, stdout=io.StringIO()
+    )
+
+
+def test_parse_mix():
+    assert parse_mix("feed=3,comment=1") == {"feed": 3, "comment": 1}
+    with pytest.raises(ValueError):
+        parse_mix("feed=3,unknown=1")
+    with pytest.raises(ValueError):
+        parse_mix("feed=0")
+
+
+def test_load_test_drives_wsgi_application(generated_data):
+    comments = Comment.objects.count()
+    report = run_load_test(
+        {"feed": 1, "detail": 1, "comment": 1},
+        threads=2, duration=30, requests=15, seed=1,
+    )
+    total = report["total"]
+    assert total["requests"] == 30
+    assert sum(total["histogram_ms"].values()) == 30
+    assert set(report["scenarios"]) == {"feed", "detail", "comment"}
+    # Общая память тестовой базы блокирует таблицы целиком, поэтому
+    # часть запросов может закончиться ошибкой блокировки.
+    feed_status = report["scenarios"]["feed"]["status"]
+    assert feed_status["200"]
+    assert set(feed_status) <= {"200", "500"}
+    posted = report["scenarios"]["comment"]["status"].get("302", 0)
+    assert posted
+    assert Comment.objects.count() == comments + posted
+    # error_rate округлён, поэтому ошибки считаются по статусам;
+    # других причин для 500, кроме блокировки, здесь нет.
+    errors = sum(
+        count for status, count in total["status"].items()
+        if not 200 <= int(status) < 400
+    )
+    assert total["lock_errors"] == errors
+
+
+def test_loadtest_command(generated_data, tmp_path):
+    output = tmp_path / "load.json"
+    call_command(
+        "loadtest", mix="detail=1", threads=1, requests=3,
+        output=str(output),
+    )
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["total"]["requests"] == 3
+    assert report["total"]["error_rate"] == 0
+    with pytest.raises(CommandError):
+        call_command("loadtest", mix="feed=x")
+
+
+def test_load_test_drives_asgi_application(generated_data):
+    report = run_load_test(
+        {"feed": 1, "detail": 1}, threads=3, duration=30, requests=4,
+        server="asgi",
+    )
+    assert report["meta"]["server"] == "asgi"
+    assert report["total"]["requests"] == 12
+    assert report["total"]["status"] == {"200": 12}
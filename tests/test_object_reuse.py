@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from conftest import count_selects
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def own_comment(mixer: Mixer, user, post_with_published_location):
+    return mixer.blend(
+        "blog.Comment", author=user, post=post_with_published_location
+    )
+
+
+@pytest.mark.parametrize("action", ("edit", "delete"))
+def test_post_views_load_post_once(
+        user_client, post_with_published_location, action
+):
+    url = f"/posts/{post_with_published_location.pk}/{action}/"
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert count_selects(ctx.captured_queries, "blog_post") == 1
+
+
+@pytest.mark.parametrize("action", ("edit_comment", "delete_comment"))
+def test_comment_views_load_comment_once(user_client, own_comment, action):
+    url = f"/posts/{own_comment.post_id}/{action}/{own_comment.pk}"
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.get(url)
+    assert response.status_code == 200
+    assert count_selects(ctx.captured_queries, "blog_comment") == 1
@@ -0,0 +1,57 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+from blog.caching import INDEX_SCOPE, get_feed_version
+from blog.models import OutgoingEmail
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_queues_notification_instead_of_sending(
+        user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.pk}/comment/"
+    user_client.post(url, {"text": "Привет"})
+    assert not mail.outbox
+    email = OutgoingEmail.objects.get()
+    assert "Привет" in email.message
+    assert email.sent_at is None
+
+
+def test_comment_invalidates_caches_after_commit(
+        user_client, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    # До коммита параллельный запрос закэшировал бы под новой версией
+    # ленту без комментария.
+    url = f"/posts/{post_with_published_location.pk}/comment/"
+    version = get_feed_version(INDEX_SCOPE)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        user_client.post(url, {"text": "Привет"})
+        assert get_feed_version(INDEX_SCOPE) == version
+    assert callbacks
+    assert get_feed_version(INDEX_SCOPE) != version
+
+
+def test_invalid_comment_queues_nothing(
+        user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.pk}/comment/"
+    user_client.post(url, {"text": ""})
+    assert not OutgoingEmail.objects.exists()
+
+
+def test_send_outbox_drains_queue_in_batches(
+        user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.pk}/comment/"
+    for i in range(5):
+        user_client.post(url, {"text": f"Комментарий {i}"})
+
+    call_command("send_outbox", batch_size=2)
+
+    assert len(mail.outbox) == 5
+    assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+    call_command("send_outbox", batch_size=2)
+    assert len(mail.outbox) == 5
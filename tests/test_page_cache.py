@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_feed_is_served_from_cache(
+        client, post_with_published_location
+):
+    first = client.get("/")
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get("/")
+    assert second.content == first.content
+    assert not ctx.captured_queries
+
+
+def test_post_edit_invalidates_cached_pages(
+        client, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    category_url = f"/category/{post.category.slug}/"
+    profile_url = f"/profile/{post.author.username}/"
+    for url in ("/", category_url, profile_url):
+        client.get(url)
+
+    post.title = "Совершенно новый заголовок"
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+
+    for url in ("/", category_url, profile_url):
+        assert post.title in client.get(url).content.decode()
+
+
+def test_new_comment_invalidates_cached_pages(
+        client, mixer: Mixer, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    client.get("/")
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Comment", post=post_with_published_location)
+    assert "Комментарии (1)" in client.get("/").content.decode()
+
+
+def test_logged_in_users_bypass_cache(user_client, client, user):
+    client.get(f"/profile/{user.username}/")
+    response = user_client.get(f"/profile/{user.username}/")
+    assert "Редактировать профиль" in response.content.decode()
+
+
+def test_comment_keeps_unrelated_pages_cached(
+        client, mixer: Mixer, user, another_user, published_category,
+        another_category, published_location,
+        django_capture_on_commit_callbacks
+):
+    def blend_post(author, category):
+        return mixer.blend(
+            "blog.Post", is_published=True, author=author,
+            category=category, location=published_location,
+        )
+
+    commented = blend_post(user, published_category)
+    other = blend_post(another_user, another_category)
+    other_urls = (
+        f"/category/{other.category.slug}/",
+        f"/profile/{other.author.username}/",
+    )
+    for url in other_urls:
+        client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Comment", post=commented, author=user)
+
+    for url in other_urls:
+        with CaptureQueriesContext(connection) as ctx:
+            client.get(url)
+        assert not ctx.captured_queries, url
+    assert "Комментарии (1)" in client.get(
+        f"/category/{commented.category.slug}/"
+    ).content.decode()
+
+
+def test_post_move_invalidates_previous_category(
+        client, post_with_published_location, another_category,
+        django_capture_on_commit_callbacks
+):
+    post = post_with_published_location
+    old_url = f"/category/{post.category.slug}/"
+    assert post.title in client.get(old_url).content.decode()
+
+    post.category = another_category
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+
+    assert post.title not in client.get(old_url).content.decode()
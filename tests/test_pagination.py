@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+from blog.mixins_filters import filter_posts
+from blog.paginators import KeysetPaginator, encode_cursor, decode_cursor
+from blog.views import IndexView
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    dates = (now - timedelta(hours=i) for i in range(N_PER_PAGE * 2 + 5))
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        pub_date=dates,
+    )
+
+
+def test_cursor_roundtrip(many_posts):
+    post = many_posts[0]
+    assert decode_cursor(encode_cursor(post)) == (post.pub_date, post.pk)
+
+
+def test_keyset_pages_walk_whole_feed(many_posts):
+    paginator = KeysetPaginator(
+        filter_posts(apply_filters=True, add_annotations=True), N_PER_PAGE
+    )
+    seen = []
+    page = paginator.page()
+    assert not page.has_previous()
+    while True:
+        seen.extend(post.pk for post in page)
+        if not page.has_next():
+            break
+        page = paginator.page(after=page.next_cursor)
+    expected = [post.pk for post in sorted(
+        many_posts, key=lambda p: (p.pub_date, p.pk), reverse=True
+    )]
+    assert seen == expected
+
+    previous = paginator.page(before=page.previous_cursor)
+    assert previous.has_next()
+    assert [post.pk for post in previous] == expected[
+        N_PER_PAGE:N_PER_PAGE * 2
+    ]
+
+
+def test_keyset_mode_in_index_view(many_posts, client, monkeypatch):
+    monkeypatch.setattr(IndexView, "keyset_pagination", True)
+    response = client.get("/")
+    page = response.context["page_obj"]
+    assert len(page) == N_PER_PAGE
+    assert f"?after={page.next_cursor}" in response.content.decode()
+    response = client.get(f"/?after={page.next_cursor}")
+    assert response.status_code == 200
+    assert client.get("/?after=broken").status_code == 404
@@ -0,0 +1,43 @@
+import pytest
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_is_reused_across_list_views(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in user_client.get("/").content.decode()
+
+    Post.objects.filter(pk=post.pk).update(title="Тихо изменённый")
+    content = user_client.get(f"/category/{post.category.slug}/").content
+    assert post.title in content.decode()
+
+
+def test_post_card_cache_follows_post_and_comments(
+        user_client, mixer: Mixer, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+
+    mixer.blend("blog.Comment", post=post)
+    assert "Комментарии (1)" in user_client.get("/").content.decode()
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in user_client.get("/").content.decode()
+
+
+def test_post_card_cache_follows_category(
+        user_client, post_with_published_location,
+        django_capture_on_commit_callbacks
+):
+    category = post_with_published_location.category
+    user_client.get("/")
+    category.title = "Переименованная категория"
+    with django_capture_on_commit_callbacks(execute=True):
+        category.save()
+    assert category.title in user_client.get("/").content.decode()
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.caching import get_next_publication, publication_aware_timeout
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def test_next_publication_is_tracked_without_queries(scheduled_post):
+    assert get_next_publication() == scheduled_post.pub_date
+    with CaptureQueriesContext(connection) as ctx:
+        assert get_next_publication() == scheduled_post.pub_date
+    assert not ctx.captured_queries
+
+
+def test_timeout_stops_at_next_publication(scheduled_post):
+    assert publication_aware_timeout(60) == 60
+    assert 3500 < publication_aware_timeout(60 * 60 * 24) <= 3600
+
+
+def test_cached_feed_expires_when_scheduled_post_goes_live(
+        client, scheduled_post, monkeypatch
+):
+    assert scheduled_post.title not in client.get("/").content.decode()
+
+    later = timezone.now() + timedelta(hours=2)
+    monkeypatch.setattr(timezone, "now", lambda: later)
+    assert scheduled_post.title in client.get("/").content.decode()
+    assert get_next_publication() is None
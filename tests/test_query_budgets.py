@@ -0,0 +1,116 @@
+from datetime import timedelta
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import urls
+from blog.instrumentation import (
+    get_query_stats, query_budget, reset_query_stats
+)
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS = 60
+N_COMMENTS = 45
+
+
+def rotate(items, count):
+    return (items[i % len(items)] for i in range(count))
+
+
+@pytest.fixture
+def feed_data(mixer: Mixer, user):
+    """Ленты больше страницы, несколько авторов, категорий и мест."""
+    authors = [user, *mixer.cycle(4).blend("auth.User")]
+    categories = mixer.cycle(3).blend("blog.Category", is_published=True)
+    locations = mixer.cycle(3).blend("blog.Location", is_published=True)
+    now = timezone.now()
+    posts = mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=rotate(authors, N_POSTS),
+        category=rotate(categories, N_POSTS),
+        location=rotate(locations, N_POSTS),
+        is_published=True,
+        image="",
+        title=rotate(["Прогулка", "Обед", "Поездка"], N_POSTS),
+        pub_date=(now - timedelta(hours=i) for i in range(N_POSTS)),
+    )
+    post = posts[0]
+    comments = mixer.cycle(N_COMMENTS).blend(
+        "blog.Comment", post=post, author=rotate(authors, N_COMMENTS)
+    )
+    return {
+        "post": post,
+        "comment": next(c for c in comments if c.author == user),
+        "category": categories[0],
+        "user": user,
+    }
+
+
+def budget_requests(data):
+    post, comment = data["post"], data["comment"]
+    slug, username = data["category"].slug, data["user"].username
+    return {
+        "blog:index": ("get", "/"),
+        "blog:search": ("get", "/search/?q=прогулка"),
+        "blog:feed": ("get", "/feed/"),
+        "blog:feed_atom": ("get", "/feed/atom/"),
+        "blog:category_posts": ("get", f"/category/{slug}/"),
+        "blog:category_feed": ("get", f"/category/{slug}/feed/"),
+        "blog:category_feed_atom": ("get", f"/category/{slug}/feed/atom/"),
+        "blog:profile": ("get", f"/profile/{username}/"),
+        "blog:profile_feed": ("get", f"/profile/{username}/feed/"),
+        "blog:profile_feed_atom": ("get", f"/profile/{username}/feed/atom/"),
+        "blog:edit_profile": ("get", "/profile/edit/"),
+        "blog:post_detail": ("get", f"/posts/{post.pk}/"),
+        "blog:comments": ("get", f"/posts/{post.pk}/comments/"),
+        "blog:create_post": ("get", "/posts/create/"),
+        "blog:edit_post": ("get", f"/posts/{post.pk}/edit/"),
+        "blog:delete_post": ("get", f"/posts/{post.pk}/delete/"),
+        "blog:add_comment": ("post", f"/posts/{post.pk}/comment/"),
+        "blog:edit_comment": (
+            "get", f"/posts/{post.pk}/edit_comment/{comment.pk}"
+        ),
+        "blog:delete_comment": (
+            "get", f"/posts/{post.pk}/delete_comment/{comment.pk}"
+        ),
+        "blog:export": ("get", "/export/posts/"),
+        "blog:query_stats": ("get", "/debug/queries/"),
+    }
+
+
+def test_every_blog_url_has_budget():
+    names = {
+        f"{urls.app_name}:{pattern.name}"
+        for pattern in urls.urlpatterns + urls.post_urls
+        if getattr(pattern, "name", None)
+    }
+    assert names == set(settings.QUERY_BUDGETS)
+
+
+def test_views_stay_within_budget(feed_data, client, user):
+    user.is_staff = True
+    user.save()
+    client.force_login(user)
+    requests = budget_requests(feed_data)
+    assert set(requests) == set(settings.QUERY_BUDGETS)
+    for view_name, (method, url) in requests.items():
+        cache.clear()
+        with query_budget(settings.QUERY_BUDGETS[view_name], view_name):
+            data = {"text": "Комментарий"} if method == "post" else None
+            response = getattr(client, method)(url, data)
+            if response.streaming:
+                b"".join(response.streaming_content)
+        assert response.status_code in (200, 302), view_name
+
+
+def test_middleware_records_stats(client, feed_data, settings):
+    settings.DEBUG = True
+    reset_query_stats()
+    response = client.get("/")
+    assert response["Server-Timing"].startswith("db;dur=")
+    stats = get_query_stats()["blog:index"]
+    assert stats["requests"] == 1
+    assert stats["max_queries"] <= settings.QUERY_BUDGETS["blog:index"]
@@ -0,0 +1,117 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.mixins_filters import filter_posts
+from blog.models import Comment, Post
+from blog.paginators import KeysetPaginator, encode_cursor
+
+pytestmark = [pytest.mark.django_db]
+
+BAD_PLAN_STEPS = (
+    re.compile(r'^SCAN (blog_post|blog_comment|blog_category)( AS \w+)?$'),
+    re.compile(r'USE TEMP B-TREE'),
+)
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_indexed(queryset):
+    plan = explain(queryset)
+    for step in plan:
+        for pattern in BAD_PLAN_STEPS:
+            assert not pattern.search(step), (
+                f'Запрос выполняется без подходящего индекса: {plan}'
+            )
+
+
+def feed_variants(post):
+    feed = filter_posts(apply_filters=True, add_annotations=True)
+    return {
+        'index': feed,
+        'category': filter_posts(
+            manager=post.category.posts,
+            apply_filters=True,
+            add_annotations=True,
+        ),
+        'profile': feed.filter(author=post.author),
+        'own_profile': filter_posts(
+            apply_filters=False, add_annotations=True
+        ).filter(author=post.author),
+        'detail': filter_posts(
+            apply_filters=False, add_annotations=False
+        ).filter(pk=post.pk),
+        'keyset': filter_posts(
+            apply_filters=True, add_annotations=True,
+            published_before=post.pub_date,
+        ).order_by(*KeysetPaginator.ordering).filter(
+            Q(pub_date__lt=post.pub_date)
+            | Q(pub_date=post.pub_date, pk__lt=post.pk)
+        ),
+    }
+
+
+@pytest.mark.parametrize(
+    'variant',
+    ('index', 'category', 'profile', 'own_profile', 'detail', 'keyset'),
+)
+def test_filter_posts_uses_indexes(variant, post_with_published_location):
+    assert_indexed(feed_variants(post_with_published_location)[variant])
+
+
+def test_comment_thread_uses_index(post_with_published_location):
+    assert_indexed(
+        Comment.objects.filter(post=post_with_published_location)
+        .select_related('author')
+    )
+
+
+def count_vm_steps(func, *args, **kwargs):
+    """Число шагов виртуальной машины SQLite при вызове func."""
+    steps = 0
+
+    def tick():
+        nonlocal steps
+        steps += 1
+
+    connection.ensure_connection()
+    connection.connection.set_progress_handler(tick, 1)
+    try:
+        func(*args, **kwargs)
+    finally:
+        connection.connection.set_progress_handler(None, 1)
+    return steps
+
+
+def test_keyset_page_cost_does_not_grow_with_depth(user, published_category):
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Публикация {i}', text='Текст', author=user,
+            category=published_category, pub_date=now - timedelta(hours=i),
+        )
+        for i in range(500)
+    )
+    posts = list(Post.objects.order_by(*KeysetPaginator.ordering))
+
+    def page_steps(post):
+        # Лента строится так же, как в KeysetPaginationMixin.
+        paginator = KeysetPaginator(filter_posts(
+            apply_filters=True, add_annotations=True,
+            published_before=min(post.pub_date, timezone.now()),
+        ), 10)
+        return count_vm_steps(paginator.page, after=encode_cursor(post))
+
+    shallow, deep = page_steps(posts[10]), page_steps(posts[480])
+    assert deep < shallow * 2, (
+        f'Глубокая страница дороже первой: {deep} против {shallow} шагов'
+    )
@@ -0,0 +1,135 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+from blog.models import Comment, Post
+from blog.search import match_expression, search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blend_post(mixer: Mixer, user, published_category):
+    def blend(**kwargs):
+        fields = dict(
+            author=user, category=published_category, is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+            title="Заметка", text="Обычный день.",
+        )
+        fields.update(kwargs)
+        return mixer.blend("blog.Post", **fields)
+    return blend
+
+
+def search(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.pk for post in response.context["page_obj"]]
+
+
+def test_match_expression_escapes_operators():
+    assert match_expression('кот OR "пёс" NEAR(') == (
+        '"кот" "OR" "пёс" "NEAR"*'
+    )
+    assert match_expression(" *() ") is None
+
+
+def test_title_ranks_above_text(client, blend_post):
+    in_text = blend_post(text="Видели дельфинов у берега.")
+    in_title = blend_post(title="Дельфины")
+    blend_post()
+    assert search(client, "дельфин") == [in_title.pk, in_text.pk]
+
+
+def test_index_follows_edits_and_comments(
+        client, blend_post, user, django_capture_on_commit_callbacks
+):
+    post = blend_post()
+    assert search(client, "вулкан") == []
+    post.text = "Извержение вулкана."
+    with django_capture_on_commit_callbacks(execute=True):
+        post.save()
+    assert search(client, "вулкан") == [post.pk]
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert search(client, "вулкан") == []
+
+    other = blend_post()
+    with django_capture_on_commit_callbacks(execute=True):
+        comment = Comment.objects.create(
+            post=other, author=user, text="Ежевика"
+        )
+    assert search(client, "ежевика") == [other.pk]
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.delete()
+    assert search(client, "ежевика") == []
+
+
+def test_hidden_posts_are_not_found(client, blend_post, mixer: Mixer):
+    hidden_category = mixer.blend("blog.Category", is_published=False)
+    blend_post(title="Скрыто", is_published=False)
+    blend_post(title="Скрыто", pub_date=timezone.now() + timedelta(days=1))
+    blend_post(title="Скрыто", category=hidden_category)
+    assert search(client, "скрыто") == []
+
+
+def test_results_are_paginated(client, blend_post):
+    for _ in range(N_PER_PAGE + 2):
+        blend_post(title="Луна")
+    assert len(search(client, "луна")) == N_PER_PAGE
+    response = client.get("/search/", {"q": "луна", "page": 2})
+    assert len(response.context["page_obj"]) == 2
+    assert "?q=%D0%BB%D1%83%D0%BD%D0%B0&amp;page=1" in (
+        response.content.decode()
+    )
+
+
+def test_comments_are_indexed_one_row_each(client, blend_post, user):
+    post = blend_post()
+    first, second = (
+        Comment.objects.create(post=post, author=user, text=text)
+        for text in ("Морошка", "Брусника")
+    )
+    assert search(client, "морошка") == [post.pk]
+    second.text = "Клюква"
+    second.save()
+    assert search(client, "брусника") == []
+    assert search(client, "клюква") == [post.pk]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT rowid FROM blog_comment_fts WHERE blog_comment_fts "
+            "MATCH 'морошка OR клюква' ORDER BY rowid"
+        )
+        assert [row[0] for row in cursor.fetchall()] == [
+            first.pk, second.pk
+        ]
+
+
+def test_comments_can_be_excluded(blend_post, user):
+    in_title = blend_post(title="Черника")
+    in_comment = blend_post()
+    Comment.objects.create(post=in_comment, author=user, text="Черника")
+    found = search_posts(Post.objects.all(), "черника")
+    assert [post.pk for post in found] == [in_title.pk, in_comment.pk]
+    found = search_posts(
+        Post.objects.all(), "черника", include_comments=False
+    )
+    assert [post.pk for post in found] == [in_title.pk]
+
+
+@pytest.mark.parametrize("include_comments,matches", [(True, 2), (False, 1)])
+def test_each_index_is_matched_once(
+        blend_post, django_assert_num_queries, include_comments, matches
+):
+    post = blend_post(title="Голубика")
+    found = search_posts(
+        Post.objects.all(), "голубика", include_comments=include_comments
+    )
+    with django_assert_num_queries(1) as ctx:
+        assert [found_post.pk for found_post in found] == [post.pk]
+    assert ctx.captured_queries[0]["sql"].count(" MATCH ") == matches
@@ -0,0 +1,62 @@
+import pytest
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from blog.loadtest import (
+    SQLITE_DEFAULT_PRAGMAS, run_load_test, sqlite_profile
+)
+from blog.sqlite import apply_sqlite_pragmas
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_new_connections_are_tuned():
+    assert pragma("synchronous") == 1
+    assert pragma("temp_store") == 2
+    assert pragma("busy_timeout") == settings.SQLITE_PRAGMAS["busy_timeout"]
+    assert pragma("cache_size") == settings.SQLITE_PRAGMAS["cache_size"]
+    assert settings.DATABASES["default"]["CONN_MAX_AGE"] > 0
+
+
+@pytest.mark.django_db
+def test_invalid_pragma_is_rejected():
+    with pytest.raises(ImproperlyConfigured):
+        apply_sqlite_pragmas(connection, {"cache_size": "1; DROP TABLE x"})
+
+
+@pytest.mark.django_db
+def test_wal_on_file_database(tmp_path):
+    settings_dict = dict(connections.settings["default"])
+    settings_dict["NAME"] = str(tmp_path / "tuned.sqlite3")
+    wrapper = DatabaseWrapper(settings_dict)
+    try:
+        wrapper.ensure_connection()
+        cursor = wrapper.connection.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal"
+        apply_sqlite_pragmas(wrapper, SQLITE_DEFAULT_PRAGMAS)
+        cursor = wrapper.connection.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "delete"
+    finally:
+        wrapper.close()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sqlite_profile_is_temporary(mixer):
+    with sqlite_profile(SQLITE_DEFAULT_PRAGMAS, 0):
+        assert settings.SQLITE_PRAGMAS == SQLITE_DEFAULT_PRAGMAS
+        assert connections.settings["default"]["CONN_MAX_AGE"] == 0
+    assert settings.SQLITE_PRAGMAS["journal_mode"] == "wal"
+    assert connections.settings["default"]["CONN_MAX_AGE"] > 0
+    mixer.blend("blog.Post", is_published=True, category__is_published=True)
+    report = run_load_test(
+        {"detail": 1}, threads=1, requests=2, profile="default"
+    )
+    assert report["meta"]["sqlite_profile"] == "default"
+    assert report["meta"]["conn_max_age"] == 0